@@ -74,16 +74,33 @@
 import os
 import streamlit as st
 from dotenv import load_dotenv
-from langdetect import detect
 from src.io.ocr import ocr_image_to_text
 from src.io.pdf import extract_text_from_pdf
-from src.io.audio import transcribe_audio_file
-from src.llm.groq_client import make_llm
-from src.graph.build import build_graph
-from langchain.schema import SystemMessage, HumanMessage
+from src.io.audio import transcribe_audio_file, warm_up_whisper
+from src.llm.translate import autodetect_lang, detect_and_translate
+from src.graph.build import build_graph, stream_answer
+from src.tools.registry import warm_up as warm_up_tools
 
 load_dotenv()
 
+# Translate inside the graph's planning call (one LLM round trip fewer for non-English input)
+TRANSLATE_IN_GRAPH = os.getenv("TRANSLATE_IN_GRAPH", "0") == "1"
+
+# Only the first pages of an uploaded PDF are shown and sent through the pipeline
+PDF_CHAR_BUDGET = int(os.getenv("PDF_CHAR_BUDGET", "12000"))
+
+# Load the Whisper model in the background at startup instead of on the first upload
+if os.getenv("WHISPER_WARMUP", "0") == "1":
+    warm_up_whisper()
+
+# Tools load their models/indexes on first use; TOOLS_WARMUP=1 starts that in the background.
+# The soil dataset download outlasts a request's tool budget, so it is warmed by default
+# (SOIL_WARMUP=0 skips it); soil questions asked meanwhile join that same download.
+if os.getenv("TOOLS_WARMUP", "0") == "1":
+    warm_up_tools()
+elif os.getenv("SOIL_WARMUP", "1") == "1":
+    warm_up_tools(["soil_nutrient"])
+
 # ----- Style Enhancements -----
 st.set_page_config(page_title="Krishi GPT", page_icon="🌾", layout="wide")
 
@@ -123,22 +140,12 @@ st.markdown(
     unsafe_allow_html=True
 )
 
-# ----- Functions -----
-def autodetect_lang(text: str) -> str:
-    try:
-        return detect(text)
-    except Exception:
-        return "en"
-
-def translate_to_english(text: str, source_lang: str):
-    if not text.strip():
-        return ""
-    llm = make_llm()
-    system = "Translate the following text to English, preserving meaning."
-    msgs = [SystemMessage(content=system), HumanMessage(content=text)]
-    return llm.invoke(msgs).content.strip()
+@st.cache_resource
+def get_workflow():
+    # Compiled once per server process instead of on every rerun
+    return build_graph(translate_in_graph=TRANSLATE_IN_GRAPH)
 
-workflow = build_graph()
+workflow = get_workflow()
 
 # ----- Tabs with Icons -----
 text_tab, image_tab, audio_tab, pdf_tab = st.tabs(["✍️ Text", "🖼️ Image", "🎙️ Audio", "📄 PDF"])
@@ -166,19 +173,28 @@ with audio_tab:
 with pdf_tab:
     pdf_file = st.file_uploader("Upload PDF", type=["pdf"])
     if pdf_file:
-        extracted_pdf = extract_text_from_pdf(pdf_file.read())
+        extracted_pdf = extract_text_from_pdf(pdf_file.read(), max_chars=PDF_CHAR_BUDGET)
         st.text_area("Extracted PDF text", value=extracted_pdf[:5000], height=180)
         user_raw_text += "\n" + extracted_pdf
 
-# ----- Processing -----
-lang = autodetect_lang(user_raw_text)
-english = translate_to_english(user_raw_text, lang)
-
 # ----- Button -----
 st.markdown("<br>", unsafe_allow_html=True)
 if st.button("🌱 Run Agentic Pipeline"):
-    state = {"user_input": user_raw_text, "language": lang, "english_input": english}
-    result_state = workflow.invoke(state)
-    st.success(result_state.get("final_answer", ""))
+    # Translate only when the pipeline runs; cached by content hash across reruns
+    if TRANSLATE_IN_GRAPH:
+        state = {"user_input": user_raw_text, "language": autodetect_lang(user_raw_text)}
+    else:
+        lang, english = detect_and_translate(user_raw_text)
+        state = {"user_input": user_raw_text, "language": lang, "english_input": english}
+    placeholder = st.empty()
+    streamed = ""
+    result_state = state
+    for kind, payload in stream_answer(workflow, state):
+        if kind == "token":
+            streamed += payload
+            placeholder.info(streamed + "▌")
+        else:
+            result_state = payload
+    placeholder.success(result_state.get("final_answer", "") or streamed)
 
 
@@ -0,0 +1,83 @@
+"""
+Compare embedding backends (fp32 PyTorch vs int8 ONNX Runtime) on policy chunks.
+
+    python -m benchmarks.bench_embeddings --pdfs 4 --batch-size 64
+
+Reports documents/second for each backend and recall@k of the ONNX
+backend's top-k neighbours against the PyTorch baseline, using
+brute-force cosine search over the same chunks.
+"""
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+from langchain_community.document_loaders import PyPDFLoader
+
+from src.tools.config import PDF_FOLDER
+from src.tools.chunking import chunk_documents
+from src.tools.embeddings import make_embeddings, ONNX_AVAILABLE
+
+QUERIES = [
+    "PM-KISAN eligibility", "PMFBY claim process", "crop insurance premium rate for farmers",
+    "soil health card testing", "eNAM registration", "ATMA scheme extension staff",
+    "PMKSY drip irrigation subsidy", "agriculture infrastructure fund interest subvention",
+    "organic farming certification support", "pesticide registration procedure",
+    "MIDH horticulture assistance", "farming agreement dispute resolution",
+]
+
+
+def load_chunks(n_pdfs):
+    files = sorted(f for f in os.listdir(PDF_FOLDER) if f.lower().endswith(".pdf"))[:n_pdfs]
+    chunks = []
+    for f in files:
+        chunks.extend(chunk_documents(PyPDFLoader(os.path.join(PDF_FOLDER, f)).load()))
+    return [c.page_content for c in chunks]
+
+
+def run(backend, texts, batch_size):
+    emb = make_embeddings(backend=backend, batch_size=batch_size)
+    emb.embed_documents(texts[:batch_size])  # warm-up (model load, graph init)
+    t0 = time.perf_counter()
+    docs = np.asarray(emb.embed_documents(texts), dtype=np.float32)
+    elapsed = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    queries = np.asarray([emb.embed_query(q) for q in QUERIES], dtype=np.float32)
+    q_elapsed = time.perf_counter() - t0
+    return docs, queries, elapsed, q_elapsed
+
+
+def top_k(docs, queries, k):
+    docs = docs / np.linalg.norm(docs, axis=1, keepdims=True)
+    queries = queries / np.linalg.norm(queries, axis=1, keepdims=True)
+    return np.argsort(-(queries @ docs.T), axis=1)[:, :k]
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--pdfs", type=int, default=4, help="number of PDFs from PDF_FOLDER to chunk")
+    ap.add_argument("--batch-size", type=int, default=64)
+    ap.add_argument("-k", type=int, default=5)
+    args = ap.parse_args(argv)
+
+    texts = load_chunks(args.pdfs)
+    print(f"{len(texts)} chunks from {args.pdfs} PDFs, batch size {args.batch_size}")
+
+    base_docs, base_q, base_t, base_qt = run("torch", texts, args.batch_size)
+    print(f"  torch  {len(texts) / base_t:8.1f} docs/s  query {base_qt / len(QUERIES) * 1000:6.1f} ms")
+    if not ONNX_AVAILABLE:
+        print("  onnx   skipped: install optimum[onnxruntime]")
+        return 0
+
+    docs, q, t, qt = run("onnx", texts, args.batch_size)
+    base_top = top_k(base_docs, base_q, args.k)
+    onnx_top = top_k(docs, q, args.k)
+    recall = np.mean([len(set(a) & set(b)) / args.k for a, b in zip(base_top, onnx_top)])
+    print(f"  onnx   {len(texts) / t:8.1f} docs/s  query {qt / len(QUERIES) * 1000:6.1f} ms  "
+          f"x{base_t / t:4.1f}  recall@{args.k} vs torch {recall:.3f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
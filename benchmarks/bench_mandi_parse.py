@@ -0,0 +1,107 @@
+"""
+Benchmark the mandi price-table parser backends on saved state pages.
+
+    python -m benchmarks.bench_mandi_parse --save rajasthan "uttar pradesh"   # fetch + save pages
+    python -m benchmarks.bench_mandi_parse                                    # benchmark saved pages
+
+Pages are read from benchmarks/data/mandi/*.html. When none are saved, a
+synthetic page shaped like commodityonline's state table is generated. A
+synthetic page with several price tables is always checked, so a backend
+that stops after the first table shows up as a MISMATCH.
+"""
+import os
+import sys
+import glob
+import time
+import random
+import argparse
+
+from src.tools.mandi_parse import iter_table_rows, MIN_PRICE_COLS, SELECTOLAX_AVAILABLE, LXML_AVAILABLE
+from src.tools.mandi_price import MANDI_HEADERS, _state_url
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "data", "mandi")
+
+
+def save_pages(states):
+    import requests
+    os.makedirs(DATA_DIR, exist_ok=True)
+    for st in states:
+        resp = requests.get(_state_url(st), headers=MANDI_HEADERS, timeout=30)
+        resp.raise_for_status()
+        path = os.path.join(DATA_DIR, f"{st.lower().replace(' ', '-')}.html")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(resp.text)
+        print(f"saved {path} ({len(resp.text) / 1024:.0f} KiB)")
+
+
+def _price_table(rnd, rows: int, offset: int = 0) -> str:
+    commodities = ["Wheat", "Mustard", "Onion", "Potato", "Tomato", "Gram", "Bajra", "Guar Seed", "Cumin Seed"]
+    body = []
+    for i in range(offset, offset + rows):
+        c = rnd.choice(commodities)
+        lo = rnd.randint(1500, 6000)
+        body.append(
+            f"<tr><td><a href='/c/{c}'>{c}</a></td><td>11/08/2025</td><td>Other</td><td>Rajasthan</td>"
+            f"<td>District {i % 33}</td><td>Market {i % 140}</td><td>₹{lo}</td><td>₹{lo + 400}</td>"
+            f"<td> ₹{lo + 200} </td></tr>"
+        )
+    return (
+        "<table><thead><tr><th>Commodity</th><th>Date</th></tr></thead><tbody>"
+        + "".join(body) + "</tbody></table>"
+    )
+
+
+def synthetic_page(rows: int = 3000, tables: int = 1) -> str:
+    rnd = random.Random(0)
+    nav = "".join(f"<li><a href='/x/{i}'>Link {i}</a></li>" for i in range(400))
+    per_table = rows // tables
+    price_tables = "<p>More prices</p>".join(_price_table(rnd, per_table, t * per_table) for t in range(tables))
+    footer = "".join(f"<p>footer paragraph {i} with some text</p>" for i in range(2000))
+    return (
+        "<html><head><title>Mandi prices</title><script>var x = 1;</script></head><body>"
+        f"<ul>{nav}</ul>{price_tables}{footer}</body></html>"
+    )
+
+
+def price_rows(html, backend):
+    return [cols for cols in iter_table_rows(html, backend) if len(cols) >= MIN_PRICE_COLS]
+
+
+def bench(html, backend, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        rows = price_rows(html, backend)
+        best = min(best, time.perf_counter() - t0)
+    return best, rows
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--save", nargs="*", metavar="STATE", help="fetch and save state pages, then exit")
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args(argv)
+
+    if args.save:
+        save_pages(args.save)
+        return 0
+
+    pages = {os.path.basename(p): open(p, encoding="utf-8").read() for p in sorted(glob.glob(os.path.join(DATA_DIR, "*.html")))}
+    if not pages:
+        print(f"no saved pages in {DATA_DIR}; using a synthetic page")
+        pages = {"synthetic": synthetic_page()}
+    pages["synthetic-3-tables"] = synthetic_page(tables=3)
+
+    backends = ["bs4"] + (["lxml"] if LXML_AVAILABLE else []) + (["selectolax"] if SELECTOLAX_AVAILABLE else [])
+    for name, html in pages.items():
+        print(f"\n{name}: {len(html) / 1024:.0f} KiB")
+        base_t, base_rows = bench(html, "bs4", args.repeat)
+        for backend in backends:
+            t, rows = (base_t, base_rows) if backend == "bs4" else bench(html, backend, args.repeat)
+            same = "ok" if rows == base_rows else "MISMATCH"
+            print(f"  {backend:<11} {t * 1000:8.1f} ms  {len(rows):5d} rows  x{base_t / t:5.1f}  {same}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
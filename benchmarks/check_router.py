@@ -0,0 +1,73 @@
+"""
+Regression check for the local fast-path router.
+
+    python -m benchmarks.check_router
+
+Each phrasing lists the tool calls the fast path must produce, or None when
+it must defer to the planner LLM (ambiguous place, unknown commodity,
+weak keyword). Also checks that keyword_plan, the planner's fallback, keeps
+the narrow baseline keyword rules. Exits non-zero on any MISMATCH.
+"""
+import sys
+
+from src.graph.router import fast_route, keyword_plan, router_stats
+
+FAST_CASES = [
+    # Not places: determiners, pronouns, times of day, generic nouns
+    ("rain in the evening", None),
+    ("weather at noon", None),
+    ("weather for sowing", None),
+    ("what is the weather in my village", None),
+    # Second place or second question
+    ("weather in patna and gaya", None),
+    ("price of wheat in Rajasthan and will it rain in Jaipur", None),
+    # Unknown commodities and non-mandi "rate"/"price"
+    ("tractor price in punjab", None),
+    ("diesel price in rajasthan", None),
+    ("What is the interest rate on KCC loans?", None),
+    # Confident routes
+    ("is it going to rain in Patna this evening", [("weather", "Patna")]),
+    ("temperature in New Delhi right now please", [("weather", "New Delhi")]),
+    ("will it rain in nagpur tomorrow", [("weather", "Nagpur")]),
+    ("rain forecast for pune", [("weather", "Pune")]),
+    ("mandi rate of onion in maharashtra", [("mandi_price", "Maharashtra,Onion")]),
+    ("onion mandi bhav in maharashtra", [("mandi_price", "Maharashtra,Onion")]),
+]
+
+FALLBACK_CASES = [
+    ("What is the interest rate on KCC loans?", []),
+    ("I actually want an action plan", []),
+    ("weather in patna", ["weather"]),
+    ("mandi price of onion in maharashtra", ["mandi_price"]),
+]
+
+
+def _calls(route):
+    if route is None:
+        return None
+    return [(t["tool_name"], t["tool_query"]) for t in route["tools_to_call"]]
+
+
+def main(argv=None):
+    failures = 0
+    print("fast_route:")
+    for question, expected in FAST_CASES:
+        got = _calls(fast_route(question))
+        ok = got == expected
+        failures += not ok
+        conf = router_stats()["last_confidence"]
+        print(f"  {'ok' if ok else 'MISMATCH':<8} {conf:4.2f}  {question!r} -> {got}" + ("" if ok else f" (expected {expected})"))
+
+    print("keyword_plan:")
+    for question, expected in FALLBACK_CASES:
+        got = [t["tool_name"] for t in keyword_plan(question)]
+        ok = got == expected
+        failures += not ok
+        print(f"  {'ok' if ok else 'MISMATCH':<8} {question!r} -> {got}" + ("" if ok else f" (expected {expected})"))
+
+    print(f"\n{failures} mismatch(es)")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,273 @@
+import os
+import re
+import time
+import asyncio
+import threading
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from ..llm.translate import lookup_translation
+from ..tools.config import INDIA_STATES_UTS
+from .router import SCHEME_NAMES, _PLACE_CONJUNCTIONS, _PLACE_STOPWORDS
+
+# ====== Semantic answer cache (in front of the compiled graph) ======
+ANSWER_CACHE_ENABLED = os.getenv("ANSWER_CACHE", "1") == "1"
+ANSWER_CACHE_THRESHOLD = float(os.getenv("ANSWER_CACHE_THRESHOLD", "0.92"))  # cosine similarity
+ANSWER_CACHE_SIZE = int(os.getenv("ANSWER_CACHE_SIZE", "1000"))
+
+# How long an answer stays reusable, by the tools it was built from (the shortest wins),
+# counted from when each tool's data was fetched rather than from when the answer was written
+ANSWER_CACHE_TTLS = {
+    name: float(os.getenv(f"ANSWER_CACHE_TTL_{name.upper()}", default))
+    for name, default in {
+        "weather": "600", "mandi_price": "3600", "web_search": "3600",
+        "soil_nutrient": str(24 * 3600), "policy_pdf": str(7 * 24 * 3600), "none": str(7 * 24 * 3600),
+    }.items()
+}
+
+# Tools whose arguments name a specific place/crop; a stored answer is reused only when
+# the new question names every one of them too
+_ARG_TOOLS = {"weather", "mandi_price", "soil_nutrient"}
+_CACHED_FIELDS = ("final_answer", "need_tool", "tools_to_call", "tool_results")
+Probe = Tuple[str, np.ndarray]  # (english question, its normalized embedding)
+_FILLER = {"the", "a", "an", "my", "our", "that", "to", "is", "are", "it", "in", "at", "of", "for", "near", "on"}
+
+
+def _words(text: Any) -> set:
+    return set(re.findall(r"[a-z]+", str(text).lower()))
+
+
+def _specifics(english: str) -> frozenset:
+    """
+    Names the question itself mentions: states, schemes, words after
+    in/at/near/of/for and before "district". "weather in Patna" and
+    "weather in Gaya" embed almost identically; these differ.
+    """
+    txt = english.lower()
+    found = {st for st in INDIA_STATES_UTS if re.search(rf"\b{re.escape(st)}\b", txt)}
+    found |= {s for s in SCHEME_NAMES if re.search(rf"\b{re.escape(s)}\b", txt)}
+    found |= set(re.findall(r"\b([a-z]+)\s+district\b", txt))
+    for m in re.finditer(r"\b(?:in|at|near|of|for)\s+([a-z][a-z\s.'-]*)", txt):
+        for word in m.group(1).split()[:3]:
+            word = word.strip(".'-")
+            if word in _PLACE_STOPWORDS or word in _PLACE_CONJUNCTIONS or word in _FILLER:
+                break
+            found.add(word)
+    return frozenset(found)
+
+
+def _plan_terms(state: Dict[str, Any]) -> Optional[frozenset]:
+    """
+    Words of the place/crop arguments the run actually used, or None when
+    some came from defaults rather than from the question (never reusable).
+    """
+    terms = set()
+    for p in state.get("tools_to_call") or []:
+        if p.get("tool_name") not in _ARG_TOOLS:
+            continue
+        q = p.get("tool_query")
+        values = [v for k, v in q.items() if k != "cycle" and v] if isinstance(q, dict) else [q]
+        for v in values:
+            terms |= _words(v)
+    return frozenset(terms) if terms <= _words(state.get("english_input") or "") else None
+
+
+def _expires_at(state: Dict[str, Any], now: float) -> float:
+    """Earliest expiry over the tool data the answer used; data served from a tool cache is already partly aged."""
+    ends = [
+        ((r.get("output") or {}).get("fetched_at") or now) + ANSWER_CACHE_TTLS.get(r.get("tool"), ANSWER_CACHE_TTLS["none"])
+        for r in state.get("tool_results") or []
+    ]
+    return min(ends, default=now + ANSWER_CACHE_TTLS["none"])
+
+
+def _cacheable(state: Dict[str, Any]) -> bool:
+    # Partial answers (tool errors/timeouts) are not worth repeating
+    if not state.get("final_answer") or state.get("timed_out_tools"):
+        return False
+    return not any("error" in (r.get("output") or {}) for r in state.get("tool_results") or [])
+
+
+class SemanticAnswerCache:
+    """Past answers indexed by the normalized embedding of their english_input."""
+
+    def __init__(self, threshold: float = ANSWER_CACHE_THRESHOLD, maxsize: int = ANSWER_CACHE_SIZE):
+        self.threshold = threshold
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: List[Dict[str, Any]] = []
+        self._matrix: Optional[np.ndarray] = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _english(state: Dict[str, Any]) -> Optional[str]:
+        english = state.get("english_input")
+        if not english and state.get("user_input"):
+            # translate-in-graph mode: reuse an earlier translation when there is one
+            known = lookup_translation(state["user_input"])
+            english = known[1] if known else None
+        return " ".join(english.split()) if english and english.strip() else None
+
+    @staticmethod
+    def _embed(text: str) -> np.ndarray:
+        from ..tools.embeddings import get_embeddings  # loads the model stack; keep it off import time
+
+        vec = np.asarray(get_embeddings().embed_query(text), dtype=np.float32)
+        return vec / (np.linalg.norm(vec) or 1.0)
+
+    def lookup(self, state: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], Optional[Probe]]:
+        """
+        Returns (hit_state, probe). On a miss, hand the probe (the embedded
+        question) to store() so the finished run is not embedded again.
+        """
+        english = self._english(state)
+        if not english:
+            return None, None
+        vec = self._embed(english)
+        specifics, words = _specifics(english), _words(english)
+        now = time.time()
+        with self._lock:
+            self._prune(now)
+            if self._entries:
+                if self._matrix is None:
+                    self._matrix = np.vstack([e["vec"] for e in self._entries])
+                sims = self._matrix @ vec
+                for i in np.argsort(-sims):
+                    if sims[i] < self.threshold:
+                        break
+                    entry = self._entries[i]
+                    if entry["specifics"] == specifics and entry["plan_terms"] <= words:
+                        self.hits += 1
+                        cached = {k: entry["state"][k] for k in _CACHED_FIELDS if k in entry["state"]}
+                        meta = {"similarity": float(sims[i]), "question": entry["english"], "age_s": now - entry["created_at"]}
+                        return {**state, **cached, "english_input": english, "answer_cache": meta}, None
+            self.misses += 1
+        return None, (english, vec)
+
+    def store(self, state: Dict[str, Any], probe: Optional[Probe] = None) -> None:
+        english = self._english(state)
+        if not english or not _cacheable(state):
+            return
+        plan_terms = _plan_terms({**state, "english_input": english})
+        if plan_terms is None:
+            return
+        now = time.time()
+        expires_at = _expires_at(state, now)
+        if expires_at <= now:
+            return
+        # The lookup's embedding is reusable unless the graph produced a different english_input
+        vec = probe[1] if probe and probe[0] == english else self._embed(english)
+        entry = {
+            "vec": vec,
+            "specifics": _specifics(english),
+            "plan_terms": plan_terms,
+            "english": english,
+            "state": {k: state[k] for k in _CACHED_FIELDS if k in state},
+            "created_at": now,
+            "expires_at": expires_at,
+        }
+        with self._lock:
+            self._entries.append(entry)
+            if len(self._entries) > self.maxsize:
+                del self._entries[:len(self._entries) - self.maxsize]
+            self._matrix = None
+
+    def _prune(self, now: float) -> None:
+        live = [e for e in self._entries if e["expires_at"] > now]
+        if len(live) != len(self._entries):
+            self._entries = live
+            self._matrix = None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._entries)}
+
+
+def _hit_events(hit: Dict[str, Any], stream_mode: Any) -> Optional[List[Any]]:
+    """What stream() would have emitted last for a finished run, or None if the mode needs a real run."""
+    if stream_mode == "values":
+        return [hit]
+    if isinstance(stream_mode, (list, tuple)) and "values" in stream_mode:
+        return [("values", hit)]
+    return None
+
+
+def _final_values(event: Any, stream_mode: Any) -> Optional[Dict[str, Any]]:
+    if stream_mode == "values":
+        return event
+    if isinstance(stream_mode, (list, tuple)) and event[0] == "values":
+        return event[1]
+    return None
+
+
+class CachedWorkflow:
+    """
+    Compiled-graph wrapper: a near-duplicate question answered recently is
+    served from the cache without planning, tools or LLM calls. invoke/stream
+    (and their async forms) keep the graph's signatures, so stream_answer
+    works unchanged; on a hit it receives only the final "values" state.
+    """
+
+    def __init__(self, workflow, cache: Optional[SemanticAnswerCache] = None):
+        self.workflow = workflow
+        self.cache = cache or SemanticAnswerCache()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.workflow, name)
+
+    def _lookup(self, state: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], Optional[Probe]]:
+        try:
+            return self.cache.lookup(state)
+        except Exception as e:
+            print(f"⚠️ answer cache lookup failed: {e}")
+            return None, None
+
+    def _store(self, state: Optional[Dict[str, Any]], probe: Optional[Probe]) -> None:
+        if state:
+            try:
+                self.cache.store(state, probe)
+            except Exception as e:
+                print(f"⚠️ answer cache store failed: {e}")
+
+    def invoke(self, state: Dict[str, Any], *args: Any, **kwargs: Any) -> Dict[str, Any]:
+        hit, probe = self._lookup(state)
+        if hit is not None:
+            return hit
+        result = self.workflow.invoke(state, *args, **kwargs)
+        self._store(result, probe)
+        return result
+
+    def stream(self, state: Dict[str, Any], *args: Any, stream_mode: Any = "values", **kwargs: Any) -> Iterator[Any]:
+        hit, probe = self._lookup(state)
+        events = _hit_events(hit, stream_mode) if hit is not None else None
+        if events is not None:
+            yield from events
+            return
+        final = None
+        for event in self.workflow.stream(state, *args, stream_mode=stream_mode, **kwargs):
+            final = _final_values(event, stream_mode) or final
+            yield event
+        self._store(final, probe)
+
+    async def ainvoke(self, state: Dict[str, Any], *args: Any, **kwargs: Any) -> Dict[str, Any]:
+        hit, probe = await asyncio.to_thread(self._lookup, state)
+        if hit is not None:
+            return hit
+        result = await self.workflow.ainvoke(state, *args, **kwargs)
+        await asyncio.to_thread(self._store, result, probe)
+        return result
+
+    async def astream(self, state: Dict[str, Any], *args: Any, stream_mode: Any = "values", **kwargs: Any) -> AsyncIterator[Any]:
+        hit, probe = await asyncio.to_thread(self._lookup, state)
+        events = _hit_events(hit, stream_mode) if hit is not None else None
+        if events is not None:
+            for event in events:
+                yield event
+            return
+        final = None
+        async for event in self.workflow.astream(state, *args, stream_mode=stream_mode, **kwargs):
+            final = _final_values(event, stream_mode) or final
+            yield event
+        await asyncio.to_thread(self._store, final, probe)
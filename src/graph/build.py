@@ -1,15 +1,34 @@
 
+from typing import Any, AsyncIterator, Dict, Iterator, Tuple
 from langgraph.graph import StateGraph, START, END
 from .state import AgentState
-from .nodes import decide_tool_node, multi_tool_node, answer_node
+from .answer_cache import ANSWER_CACHE_ENABLED, CachedWorkflow
+from .nodes import (
+    decide_tool_node, multi_tool_node, answer_node,
+    decide_tool_node_async, multi_tool_node_async, answer_node_async,
+    translate_and_plan_node, translate_and_plan_node_async,
+)
 
-def build_graph():
+def build_graph(use_async: bool = False, translate_in_graph: bool = False, answer_cache: bool = ANSWER_CACHE_ENABLED):
+    """
+    use_async=True wires the coroutine nodes; run the result with
+    `await workflow.ainvoke(state)` / `workflow.astream(...)`.
+    translate_in_graph=True makes "decide" translate and plan in one LLM call,
+    so callers pass user_input + language and leave english_input unset.
+    answer_cache=True (ANSWER_CACHE=1) serves near-duplicate questions from
+    the semantic answer cache.
+    """
     workflow = StateGraph(AgentState)
 
     # Nodes
-    workflow.add_node("decide", decide_tool_node)
-    workflow.add_node("multi_tool", multi_tool_node)
-    workflow.add_node("answer", answer_node)
+    if use_async:
+        workflow.add_node("decide", translate_and_plan_node_async if translate_in_graph else decide_tool_node_async)
+        workflow.add_node("multi_tool", multi_tool_node_async)
+        workflow.add_node("answer", answer_node_async)
+    else:
+        workflow.add_node("decide", translate_and_plan_node if translate_in_graph else decide_tool_node)
+        workflow.add_node("multi_tool", multi_tool_node)
+        workflow.add_node("answer", answer_node)
 
     # Route: decide → (multi_tool | answer)
     def route_decision(state: AgentState) -> str:
@@ -23,4 +42,32 @@ def build_graph():
     workflow.add_edge("multi_tool", "answer")
     workflow.add_edge("answer", END)
 
-    return workflow.compile()
+    compiled = workflow.compile()
+    return CachedWorkflow(compiled) if answer_cache else compiled
+
+def stream_answer(workflow, state: Dict[str, Any]) -> Iterator[Tuple[str, Any]]:
+    """
+    Runs the graph and yields ("token", text) for each answer_node token as it
+    arrives, then a single ("final", state) with the complete result.
+    """
+    final: Dict[str, Any] = dict(state)
+    for mode, payload in workflow.stream(state, stream_mode=["messages", "values"]):
+        if mode == "messages":
+            chunk, meta = payload
+            if meta.get("langgraph_node") == "answer" and chunk.content:
+                yield "token", chunk.content
+        else:
+            final = payload
+    yield "final", final
+
+async def astream_answer(workflow, state: Dict[str, Any]) -> AsyncIterator[Tuple[str, Any]]:
+    """Async counterpart of stream_answer for graphs built with use_async=True."""
+    final: Dict[str, Any] = dict(state)
+    async for mode, payload in workflow.astream(state, stream_mode=["messages", "values"]):
+        if mode == "messages":
+            chunk, meta = payload
+            if meta.get("langgraph_node") == "answer" and chunk.content:
+                yield "token", chunk.content
+        else:
+            final = payload
+    yield "final", final
@@ -1,351 +1,24 @@
 
 import os
-import re
 import json
-import requests
-from typing import Dict, Any, List, Tuple
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import time
+import asyncio
+import threading
+from typing import Dict, Any, List, Optional
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 
-from bs4 import BeautifulSoup
 from langchain.schema import SystemMessage, HumanMessage
 from ..llm.groq_client import make_llm
-from ..tools.tavily_tool import tavily_search
-
-import sys
-
-# Force Chroma to use a modern SQLite version from pysqlite3-binary
-try:
-    __import__("pysqlite3")
-    sys.modules["sqlite3"] = sys.modules.pop("pysqlite3")
-except ImportError:
-    pass
-
-
-# ====== Vector DB for PDFs ======
-from langchain_community.document_loaders import PyPDFLoader
-from langchain_community.vectorstores import Chroma
-from langchain_community.embeddings import HuggingFaceEmbeddings
-
-PDF_FOLDER = "Major Schemes"
-VECTOR_DB_DIR = "vector_db_policy"
-
-def get_policy_vector_db():
-    embeddings = HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2")
-    if os.path.exists(VECTOR_DB_DIR):
-        return Chroma(persist_directory=VECTOR_DB_DIR, embedding_function=embeddings)
-
-    docs = []
-    if os.path.isdir(PDF_FOLDER):
-        for file in os.listdir(PDF_FOLDER):
-            if file.lower().endswith(".pdf"):
-                loader = PyPDFLoader(os.path.join(PDF_FOLDER, file))
-                docs.extend(loader.load())
-
-    vectordb = Chroma.from_documents(docs, embeddings, persist_directory=VECTOR_DB_DIR)
-    vectordb.persist()
-    return vectordb
-
-policy_db = get_policy_vector_db()
-
-# ====== Helper: India states / UTs (for mandi parsing) ======
-INDIA_STATES_UTS = {
-    "andhra pradesh","arunachal pradesh","assam","bihar","chhattisgarh","goa","gujarat","haryana","himachal pradesh",
-    "jharkhand","karnataka","kerala","madhya pradesh","maharashtra","manipur","meghalaya","mizoram","nagaland",
-    "odisha","punjab","rajasthan","sikkim","tamil nadu","telangana","tripura","uttar pradesh","uttarakhand","west bengal",
-    "andaman and nicobar islands","chandigarh","dadra and nagar haveli and daman and diu","delhi","lakshadweep",
-    "puducherry","jammu and kashmir","ladakh","nct of delhi","ncr"
-}
-
-# ====== Tools ======
-
-# Web Search (Tavily)
-def web_search_tool_node(state: Dict[str, Any]) -> Dict[str, Any]:
-    if not state.get("tool_query"):
-        return {**state, "tool_result": {"error": "Empty query"}}
-    try:
-        result = tavily_search(state["tool_query"], max_results=6)
-    except Exception as e:
-        result = {"error": str(e), "results": []}
-    return {**state, "tool_result": result}
-
-# Mandi Price (scrape)
-def mandi_price_tool_node(state: Dict[str, Any]) -> Dict[str, Any]:
-    """
-    Expects tool_query: 'state,commodity' (e.g., 'Rajasthan,Wheat')
-    """
-    query = state.get("tool_query", "")
-    if not query or "," not in query:
-        return {**state, "tool_result": {"error": "tool_query must be 'state,commodity'"}}
-
-    try:
-        state_name, commodity = [p.strip() for p in query.split(",", 1)]
-
-        base_url = "https://www.commodityonline.com/mandiprices/state"
-        url = f"{base_url}/{state_name.lower().replace(' ', '-')}"
-        headers = {
-            "User-Agent": (
-                "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                "AppleWebKit/537.36 (KHTML, like Gecko) "
-                "Chrome/115.0.0.0 Safari/537.36"
-            ),
-            "Accept-Language": "en-IN,en;q=0.9"
-        }
-
-        resp = requests.get(url, headers=headers, timeout=20)
-        resp.raise_for_status()
-        soup = BeautifulSoup(resp.text, "html.parser")
-
-        rows = soup.select("tr")[1:]  # skip header
-        results = []
-        for row in rows:
-            cols = [td.get_text(strip=True) for td in row.find_all("td")]
-            if not cols or len(cols) < 9:
-                continue
-            rec = {
-                "Commodity": cols[0],
-                "Arrival Date": cols[1],
-                "Variety": cols[2],
-                "State": cols[3],
-                "District": cols[4],
-                "Market": cols[5],
-                "Min Price": cols[6],
-                "Max Price": cols[7],
-                "Avg Price": cols[8]
-            }
-            if rec["Commodity"].lower() == commodity.lower():
-                results.append(rec)
-
-        if not results:
-            raise ValueError(f"No data found for commodity '{commodity}' in state '{state_name}'.")
-
-        tool_result = {"results": results, "state": state_name, "commodity": commodity}
-
-    except Exception as e:
-        tool_result = {"error": str(e)}
-
-    return {**state, "tool_result": tool_result}
-
-# Weather (WeatherAPI)
-#WEATHERAPI_KEY=os.getenv("OPENWEATHER_API_KEY")
-WEATHERAPI_KEY="75c43d92e1f8407590b205917251108"
-
-
-def weather_tool_node(state: Dict[str, Any]) -> Dict[str, Any]:
-    q = state.get("tool_query")
-    if not q:
-        return {**state, "tool_result": {"error": "Empty query"}}
-    if not WEATHERAPI_KEY:
-        return {**state, "tool_result": {"error": "Missing WEATHERAPI_KEY"}}
-
-    city = str(q).strip()  # already formatted to a city name by formatter
-    url = f"http://api.weatherapi.com/v1/current.json?key={WEATHERAPI_KEY}&q={city}&aqi=no"
-
-    try:
-        res = requests.get(url, timeout=15).json()
-        if "error" in res:
-            raise ValueError(res["error"].get("message", "Error fetching weather"))
-        weather_info = {
-            "location": f"{res['location']['name']}, {res['location']['country']}",
-            "localtime": res['location']['localtime'],
-            "temperature_c": res['current']['temp_c'],
-            "temperature_f": res['current']['temp_f'],
-            "feels_like_c": res['current']['feelslike_c'],
-            "condition": res['current']['condition']['text'],
-            "humidity": res['current']['humidity'],
-            "wind_kph": res['current']['wind_kph'],
-            "wind_dir": res['current']['wind_dir'],
-        }
-    except Exception as e:
-        weather_info = {"error": str(e)}
-
-    return {**state, "tool_result": weather_info}
-
-# Policy PDF Search (Chroma)
-def policy_pdf_tool_node(state: Dict[str, Any]) -> Dict[str, Any]:
-    q = state.get("tool_query", "")
-    if not q:
-        return {**state, "tool_result": {"error": "Empty query"}}
-    try:
-        results = policy_db.similarity_search(q, k=5)
-        result_list = [{"content": r.page_content, "metadata": r.metadata} for r in results]
-        tool_result = {"results": result_list}
-    except Exception as e:
-        tool_result = {"error": str(e)}
-    return {**state, "tool_result": tool_result}
-
-import requests
-import json
-from typing import Dict, Any
-
-GQL_URL = "https://soilhealth4.dac.gov.in/"
-
-GQL_QUERY = """
-query GetNutrientDashboardForPortal(
-  $state: ID, $district: ID, $block: ID, $village: ID,
-  $cycle: String, $count: Boolean
-) {
-  getNutrientDashboardForPortal(
-    state: $state
-    district: $district
-    block: $block
-    village: $village
-    cycle: $cycle
-    count: $count
-  )
-}
-"""
-
-HEADERS = {
-    "Content-Type": "application/json",
-    "User-Agent": "Mozilla/5.0",
-    "Origin": "https://soilhealth.dac.gov.in",
-    "Referer": "https://soilhealth.dac.gov.in/",
-    "Accept": "*/*",
-}
-
-# ---------------------------
-# Core Functions
-# ---------------------------
-
-def gql_post(query: str, variables: dict):
-    payload = {
-        "operationName": "GetNutrientDashboardForPortal",
-        "variables": variables,
-        "query": query,
-    }
-    r = requests.post(GQL_URL, json=payload, headers=HEADERS, timeout=30)
-    r.raise_for_status()
-    j = r.json()
-    if "errors" in j:
-        raise RuntimeError(j["errors"])
-    return j["data"]["getNutrientDashboardForPortal"]
-
-def fetch_all_states(cycle="2025-26"):
-    """Fetch entire India dataset once (all states/districts)."""
-    return gql_post(GQL_QUERY, {"cycle": cycle})
-
-def filter_by_state(all_data, state_name: str):
-    """Filter dataset by state name (case-insensitive)."""
-    state_name = state_name.lower()
-    return [
-        row for row in all_data
-        if str(row.get("state", {}).get("name", "")).strip().lower() == state_name
-    ]
-
-# ---------------------------
-# Tool Node
-# ---------------------------
-
-# Cache so we don’t hit API every call
-_ALL_DATA_CACHE = None
-
-def soil_nutrient_tool_node(state: Dict[str, Any]) -> Dict[str, Any]:
-    """
-    Tool node to get soil nutrient info for a given state.
-    Expected input:
-      state["tool_query"] = {
-        "cycle": "2025-26",   # optional, default = 2025-26
-        "state_name": "Bihar"
-      }
-    """
-    global _ALL_DATA_CACHE
-
-    q = state.get("tool_query")
-    if q is None:
-        return {**state, "tool_result": {"error": "Empty query"}}
-
-    if isinstance(q, str):
-        try:
-            q = json.loads(q)
-        except Exception:
-            return {**state, "tool_result": {"error": "Invalid query format"}}
-
-    cycle = q.get("cycle", "2025-26")
-    state_name = q.get("state_name")
-
-    if not state_name:
-        return {**state, "tool_result": {"error": "Missing 'state_name' in query"}}
-
-    try:
-        # Fetch all data once per cycle (cache)
-        if _ALL_DATA_CACHE is None or _ALL_DATA_CACHE.get("cycle") != cycle:
-            all_data = fetch_all_states(cycle)
-            _ALL_DATA_CACHE = {"cycle": cycle, "data": all_data}
-        else:
-            all_data = _ALL_DATA_CACHE["data"]
-
-        # Filter by state
-        results = filter_by_state(all_data, state_name)
-        if not results:
-            return {**state, "tool_result": {"error": f"No data found for state '{state_name}'"}}
-
-        return {
-            **state,
-            "tool_result": {
-                "cycle": cycle,
-                "state_name": state_name,
-                "results": results
-            }
-        }
-
-    except Exception as e:
-        return {**state, "tool_result": {"error": str(e)}} 
-
-
-
-# ====== Argument formatting helpers ======
-def _extract_city_for_weather(text: str) -> str:
-    text_l = text.lower()
-    # Common patterns: "weather in Delhi", "temperature in Mumbai today"
-    m = re.search(r"(?:in|at)\s+([a-zA-Z .'-]+)", text_l)
-    if m:
-        city = m.group(1).strip(" .'-")
-        # cut trailing words like 'today', 'now'
-        city = re.split(r"\b(today|now|tomorrow|this week|forecast)\b", city)[0].strip()
-        return city.title()
-    # Fallback: last capitalized token heuristic
-    tokens = re.findall(r"[A-Z][a-zA-Z'-]+", text)
-    if tokens:
-        return tokens[-1]
-    return text.strip()
-
-def _extract_mandi_state_commodity(text: str) -> Tuple[str, str]:
-    t = text.lower()
-    # Find state/UT
-    found_state = None
-    for st in INDIA_STATES_UTS:
-        if st in t:
-            found_state = st
-            break
-    # Commodity: after "price of|rate of|for" or last word
-    m = re.search(r"(?:price|prices|rate|rates)\s+(?:of|for)\s+([a-zA-Z /'-]+)", t)
-    commodity = None
-    if m:
-        commodity = m.group(1).strip(" .'-")
-    if not commodity:
-        # Try words before 'in <state>'
-        if found_state:
-            before = t.split(found_state)[0]
-            last = re.findall(r"[a-z]+", before)
-            if last:
-                commodity = last[-1]
-    if not found_state:
-        # Last resort: Delhi/NCR alias
-        if "delhi" in t or "ncr" in t:
-            found_state = "nct of delhi"
-    if not commodity:
-        commodity = "wheat"
-    if not found_state:
-        found_state = "rajasthan"
-    return (found_state.title(), commodity.title())
+from ..llm.translate import detect_and_translate, lookup_translation, remember_translation
+from ..tools.config import TOOL_TIMEOUTS
+from ..tools.deadline import set_deadline, reset_deadline
+from ..tools.registry import get_tool, get_batch_tool
+from ..tools.result_cache import get_result_cache
+from ..tools.utils import extract_city_for_weather, extract_mandi_state_commodity
+from .router import fast_route, keyword_plan
 
 
-def decide_tool_node(state: Dict[str, Any]) -> Dict[str, Any]:
-    """
-    Plans which tools to call and RETURNS ALREADY-FORMATTED tool_query per tool.
-    """
-    llm = make_llm()
-    system = """
+PLANNER_SYSTEM_PROMPT = """
 You are a routing & argument-formatting controller.
 
 TOOLS & ARG FORMAT:
@@ -367,10 +40,12 @@ Return JSON ONLY:
 }
 Pick ALL tools that are required to fully answer the user.
 """
-    user_q = state.get("english_input") or state.get("user_input") or ""
-    msgs = [SystemMessage(content=system), HumanMessage(content=f"User question: {user_q}")]
-    out = llm.invoke(msgs).content.strip()
 
+def _plan_messages(user_q: str) -> List[Any]:
+    return [SystemMessage(content=PLANNER_SYSTEM_PROMPT), HumanMessage(content=f"User question: {user_q}")]
+
+def _finalize_plan(state: Dict[str, Any], user_q: str, out: str) -> Dict[str, Any]:
+    """Parses the planner output (with keyword fallback) into normalized tools_to_call."""
     # Defaults
     need_tool = False
     tools_to_call: List[Dict[str, Any]] = []
@@ -381,48 +56,34 @@ Pick ALL tools that are required to fully answer the user.
         tools_to_call = data.get("tools_to_call", [])
     except Exception:
         # Fallback coarse routing if LLM JSON fails
-        txt = (user_q or "").lower()
-        if any(k in txt for k in ["weather", "temperature", "rain", "forecast"]):
-            need_tool = True
-            tools_to_call.append({"tool_name": "weather", "tool_query": _extract_city_for_weather(user_q)})
-        if any(k in txt for k in ["mandi", "market price", "crop price", "vegetable price", "commodity price"]):
-            need_tool = True
-            st, com = _extract_mandi_state_commodity(user_q)
-            tools_to_call.append({"tool_name": "mandi_price", "tool_query": f"{st},{com}"})
-        if any(k in txt for k in ["policy", "scheme", "act", "government"]):
-            need_tool = True
-            tools_to_call.append({"tool_name": "policy_pdf", "tool_query": user_q})
-        if any(k in txt for k in ["soil", "nutrient", "soil health", "fertility", "nitrogen", "phosphorus", "potassium"]):
-            need_tool = True
-            # crude extraction of state name from query text
-            found_state = None
-            for st in INDIA_STATES_UTS:
-                if st.lower() in txt:
-                    found_state = st
-                    break
-            payload = {"cycle": "2025-26"}
-            if found_state:
-                payload["state_name"] = found_state
-            tools_to_call.append({"tool_name": "soil_nutrient", "tool_query": payload})
-        if any(k in txt for k in ["latest", "news", "update"]):
-            need_tool = True
-            tools_to_call.append({"tool_name": "web_search", "tool_query": user_q})
-
-    # Post-process / normalize arg formats
+        tools_to_call = keyword_plan(user_q)
+        need_tool = bool(tools_to_call)
+
+    deduped = _normalize_tools(tools_to_call, user_q)
+
+    print("📝 decide_tool_node decision:")
+    print("   Input:", user_q)
+    print("   LLM raw:", out)
+    print("   Final tools_to_call:", deduped)
+
+    return {**state, "need_tool": bool(deduped), "tools_to_call": deduped, "route_source": "llm"}
+
+def _normalize_tools(tools_to_call: List[Dict[str, Any]], user_q: str, extracted: bool = False) -> List[Dict[str, Any]]:
+    # Post-process / normalize arg formats; extracted=True when the args already come from the local router
     normalized: List[Dict[str, Any]] = []
     for t in tools_to_call:
         name = (t.get("tool_name") or "").strip()
         q = t.get("tool_query", "")
 
         if name == "weather":
-            city = _extract_city_for_weather(str(q or user_q))
+            city = str(q).strip() if extracted and q else extract_city_for_weather(str(q or user_q))
             normalized.append({"tool_name": "weather", "tool_query": city or "Delhi"})
 
         elif name == "mandi_price":
             if isinstance(q, str) and "," in q:
                 state_part, commodity_part = [p.strip() for p in q.split(",", 1)]
             else:
-                state_part, commodity_part = _extract_mandi_state_commodity(user_q)
+                state_part, commodity_part = extract_mandi_state_commodity(user_q)
             normalized.append({"tool_name": "mandi_price", "tool_query": f"{state_part},{commodity_part}"})
 
         elif name == "policy_pdf":
@@ -452,61 +113,322 @@ Pick ALL tools that are required to fully answer the user.
         if key not in seen:
             seen.add(key)
             deduped.append(t)
+    return deduped
+
+def _fast_plan(state: Dict[str, Any], user_q: str):
+    """Local router result as a finished state update, or None to defer to the LLM planner."""
+    route = fast_route(user_q)
+    if route is None:
+        return None
+    deduped = _normalize_tools(route["tools_to_call"], user_q, extracted=True)
+    print(f"⚡ fast route (confidence {route['confidence']:.2f}):", deduped)
+    return {
+        **state,
+        "need_tool": bool(deduped),
+        "tools_to_call": deduped,
+        "route_source": "fast_path",
+        "route_confidence": route["confidence"],
+    }
 
-    print("📝 decide_tool_node decision:")
-    print("   Input:", user_q)
-    print("   LLM raw:", out)
-    print("   Final tools_to_call:", deduped)
+def decide_tool_node(state: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Plans which tools to call and RETURNS ALREADY-FORMATTED tool_query per tool.
+    """
+    user_q = state.get("english_input") or state.get("user_input") or ""
+    fast = _fast_plan(state, user_q)
+    if fast is not None:
+        return fast
+    llm = make_llm()
+    out = llm.invoke(_plan_messages(user_q)).content.strip()
+    return _finalize_plan(state, user_q, out)
+
+async def decide_tool_node_async(state: Dict[str, Any]) -> Dict[str, Any]:
+    user_q = state.get("english_input") or state.get("user_input") or ""
+    fast = _fast_plan(state, user_q)
+    if fast is not None:
+        return fast
+    llm = make_llm()
+    out = (await llm.ainvoke(_plan_messages(user_q))).content.strip()
+    return _finalize_plan(state, user_q, out)
+
+# ========== Combined translate + plan ==========
+TRANSLATE_PLAN_SYSTEM_PROMPT = PLANNER_SYSTEM_PROMPT.replace(
+    """Return JSON ONLY:
+{
+  "need_tool": bool,""",
+    """The user may write in Hindi or another Indian language. First translate the
+question to English, preserving meaning, then plan the tools from the English text.
+
+Return JSON ONLY:
+{
+  "english_input": "<the question translated to English>",
+  "need_tool": bool,""",
+)
 
-    return {**state, "need_tool": bool(deduped), "tools_to_call": deduped}
+def _translate_plan_messages(user_input: str) -> List[Any]:
+    return [SystemMessage(content=TRANSLATE_PLAN_SYSTEM_PROMPT), HumanMessage(content=f"User question: {user_input}")]
+
+def _split_translate_plan(state: Dict[str, Any], out: str):
+    """Fills english_input and the plan from one completion, or None if it is not usable JSON."""
+    try:
+        english = str(json.loads(out).get("english_input") or "").strip()
+    except Exception:
+        return None
+    if not english:
+        return None
+    remember_translation(state.get("user_input") or "", state.get("language") or "", english)
+    return _finalize_plan({**state, "english_input": english}, english, out)
+
+def _known_english(state: Dict[str, Any]):
+    """english_input when it is already known (given, English, or cached), else None."""
+    if state.get("english_input"):
+        return state["english_input"]
+    if (state.get("language") or "en") == "en":
+        return state.get("user_input") or ""
+    cached = lookup_translation(state.get("user_input") or "")
+    return cached[1] if cached else None
+
+def translate_and_plan_node(state: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Drop-in replacement for decide_tool_node when app.py leaves english_input
+    unset: translation and tool planning share a single completion.
+    """
+    english = _known_english(state)
+    if english is not None:
+        return decide_tool_node({**state, "english_input": english})
+
+    llm = make_llm()
+    out = llm.invoke(_translate_plan_messages(state.get("user_input") or "")).content.strip()
+    planned = _split_translate_plan(state, out)
+    if planned is not None:
+        return planned
+
+    # Unusable JSON: fall back to the sequential translate → plan path
+    _, english = detect_and_translate(state.get("user_input") or "")
+    return decide_tool_node({**state, "english_input": english})
+
+async def translate_and_plan_node_async(state: Dict[str, Any]) -> Dict[str, Any]:
+    english = _known_english(state)
+    if english is not None:
+        return await decide_tool_node_async({**state, "english_input": english})
+
+    llm = make_llm()
+    out = (await llm.ainvoke(_translate_plan_messages(state.get("user_input") or ""))).content.strip()
+    planned = _split_translate_plan(state, out)
+    if planned is not None:
+        return planned
+
+    _, english = await asyncio.to_thread(detect_and_translate, state.get("user_input") or "")
+    return await decide_tool_node_async({**state, "english_input": english})
 
 
 
 
 
 # ====== Multi-tool executor (concurrent, single state update) ======
+# Whole tool phase is bounded by TOOL_BUDGET_SECONDS; each tool also has its own
+# timeout (TOOL_TIMEOUTS), counted from when its job starts running. The job's
+# deadline is passed down (tools.deadline) to HTTP reads and single-flight waits.
+# Tools still running at their deadline are reported as timed out and the
+# answer is composed from whatever arrived.
+TOOL_BUDGET_SECONDS = float(os.getenv("TOOL_BUDGET_SECONDS", "12"))
+# One small pool per tool, shared by all sessions: a slow upstream can only tie up its own workers
+TOOL_WORKERS_PER_TOOL = int(os.getenv("TOOL_WORKERS_PER_TOOL", "4"))
+_QUEUE_POLL = 0.05  # seconds; how often queued jobs are checked for having started
+_TOOL_POOLS: Dict[str, ThreadPoolExecutor] = {}
+_POOLS_LOCK = threading.Lock()
+
+def _tool_pool(tool_name: str) -> ThreadPoolExecutor:
+    pool = _TOOL_POOLS.get(tool_name)
+    if pool is None:
+        with _POOLS_LOCK:
+            pool = _TOOL_POOLS.get(tool_name)
+            if pool is None:
+                pool = ThreadPoolExecutor(max_workers=TOOL_WORKERS_PER_TOOL, thread_name_prefix=f"tool-{tool_name}")
+                _TOOL_POOLS[tool_name] = pool
+    return pool
+
+def _store_output(tool_name: str, query: Any, output: Dict[str, Any]) -> None:
+    # Errors and timeouts are never persisted
+    if output and "error" not in output:
+        get_result_cache().set(tool_name, query, output)
+
 def _run_single_tool(tool_name: str, query: Any, base_state: Dict[str, Any]) -> Dict[str, Any]:
-    tool_map = {
-        "web_search": web_search_tool_node,
-        "weather": weather_tool_node,
-        "policy_pdf": policy_pdf_tool_node,
-        "mandi_price": mandi_price_tool_node,
-        "soil_nutrient": soil_nutrient_tool_node,
-    }
-    fn = tool_map.get(tool_name)
+    fn = get_tool(tool_name)
     if not fn:
         return {"tool": tool_name, "query": query, "output": {"error": f"Unknown tool: {tool_name}"}}
+    cached = get_result_cache().get(tool_name, query)
+    if cached is not None:
+        return {"tool": tool_name, "query": query, "output": cached}
     try:
         tool_state = fn({**base_state, "tool_query": query})
         output = tool_state.get("tool_result") or tool_state.get("soil_nutrient_result") or {}
+        _store_output(tool_name, query, output)
         return {"tool": tool_name, "query": query, "output": output}
     except Exception as e:
         return {"tool": tool_name, "query": query, "output": {"error": str(e)}}
 
+def _run_batch_tool(tool_name: str, queries: List[Any], base_state: Dict[str, Any]) -> List[Dict[str, Any]]:
+    outputs = [get_result_cache().get(tool_name, q) for q in queries]
+    todo = [i for i, out in enumerate(outputs) if out is None]
+    if todo:
+        try:
+            fetched = get_batch_tool(tool_name)([queries[i] for i in todo])
+        except Exception as e:
+            fetched = [{"error": str(e)}] * len(todo)
+        for i, out in zip(todo, fetched):
+            outputs[i] = out
+            _store_output(tool_name, queries[i], out)
+    return [{"tool": tool_name, "query": q, "output": out} for q, out in zip(queries, outputs)]
+
+def _tool_jobs(plans: List[Dict[str, Any]]) -> List[List[int]]:
+    """Groups plan indexes into jobs: one per plan, except batch-capable tools (weather) get one job for all their plans."""
+    jobs: List[List[int]] = []
+    batched: Dict[str, List[int]] = {}
+    for i, p in enumerate(plans):
+        if get_batch_tool(p["tool_name"]) is not None:
+            if p["tool_name"] not in batched:
+                batched[p["tool_name"]] = []
+                jobs.append(batched[p["tool_name"]])
+            batched[p["tool_name"]].append(i)
+        else:
+            jobs.append([i])
+    return jobs
+
+def _run_job(job: List[int], plans: List[Dict[str, Any]], base_state: Dict[str, Any]) -> List[Dict[str, Any]]:
+    if len(job) == 1:
+        p = plans[job[0]]
+        return [_run_single_tool(p["tool_name"], p["tool_query"], base_state)]
+    return _run_batch_tool(plans[job[0]]["tool_name"], [plans[i]["tool_query"] for i in job], base_state)
+
+def _run_job_with_deadline(j: int, jobs: List[List[int]], plans: List[Dict[str, Any]], base_state: Dict[str, Any],
+                           limit: float, budget_end: float, deadlines: List[Optional[float]]) -> List[Dict[str, Any]]:
+    """Runs in the tool's worker: the job's clock starts now, not when it was queued."""
+    deadline = min(time.monotonic() + limit, budget_end)
+    deadlines[j] = deadline
+    token = set_deadline(deadline)
+    try:
+        return _run_job(jobs[j], plans, base_state)
+    finally:
+        reset_deadline(token)
+
+def _timed_out(tool_name: str, query: Any, seconds: float) -> Dict[str, Any]:
+    return {"tool": tool_name, "query": query, "output": {"error": f"timed out after {seconds:g}s", "timed_out": True}}
+
+def _deadlines(state: Dict[str, Any], plans: List[Dict[str, Any]]) -> List[float]:
+    """Seconds each planned tool may run: its own timeout, capped by the request budget."""
+    budget = float(state.get("tool_budget_s") or TOOL_BUDGET_SECONDS)
+    return [min(TOOL_TIMEOUTS.get(p["tool_name"], budget), budget) for p in plans]
+
 def multi_tool_node(state: Dict[str, Any]) -> Dict[str, Any]:
     plans = state.get("tools_to_call", [])
     if not plans:
         return state
 
-    results: List[Dict[str, Any]] = []
-    with ThreadPoolExecutor(max_workers=min(8, max(1, len(plans)))) as ex:
-        futures = [ex.submit(_run_single_tool, p["tool_name"], p["tool_query"], state) for p in plans]
-        for fut in as_completed(futures):
-            results.append(fut.result())
-
-    # Maintain stable order similar to input plans
-    ordered = []
-    for p in plans:
-        for r in results:
-            if r["tool"] == p["tool_name"] and r["query"] == p["tool_query"]:
-                ordered.append(r); break
+    start = time.monotonic()
+    budget_end = start + float(state.get("tool_budget_s") or TOOL_BUDGET_SECONDS)
+    limits = _deadlines(state, plans)
+    jobs = _tool_jobs(plans)
+    # Absolute deadline per job, set when it starts; a queued job waits at most until the budget ends
+    deadlines: List[Optional[float]] = [None] * len(jobs)
+    futures = {
+        _tool_pool(plans[job[0]]["tool_name"]).submit(
+            _run_job_with_deadline, j, jobs, plans, state, limits[job[0]], budget_end, deadlines
+        ): j
+        for j, job in enumerate(jobs)
+    }
+    results: List[Any] = [None] * len(plans)
+    pending = set(futures)
+    while pending:
+        now = time.monotonic()
+        for fut in [f for f in pending if (deadlines[futures[f]] or budget_end) <= now]:
+            # Threads cannot be interrupted: drop the straggler (its deadline-bound HTTP timeout ends it)
+            fut.cancel()
+            pending.discard(fut)
+            for i in jobs[futures[fut]]:
+                results[i] = _timed_out(plans[i]["tool_name"], plans[i]["tool_query"], round(now - start, 1))
+        if not pending:
+            break
+        wake = min(deadlines[futures[f]] or budget_end for f in pending) - now
+        if any(deadlines[futures[f]] is None for f in pending):
+            wake = min(wake, _QUEUE_POLL)
+        done, pending = wait(pending, timeout=max(wake, 0), return_when=FIRST_COMPLETED)
+        for fut in done:
+            for i, r in zip(jobs[futures[fut]], fut.result()):
+                results[i] = r
+
+    timed_out = [r["tool"] for r in results if r["output"].get("timed_out")]
+    return {**state, "tool_results": results, "timed_out_tools": timed_out}
+
+# ========== Async execution path ==========
+async def _run_single_tool_async(tool_name: str, query: Any, base_state: Dict[str, Any], timeout: float) -> Dict[str, Any]:
+    fn = get_tool(tool_name, use_async=True)
+    if not fn:
+        return {"tool": tool_name, "query": query, "output": {"error": f"Unknown tool: {tool_name}"}}
+    # Local SQLite lookups take well under a millisecond; no thread hop needed
+    cached = get_result_cache().get(tool_name, query)
+    if cached is not None:
+        return {"tool": tool_name, "query": query, "output": cached}
+    token = set_deadline(time.monotonic() + timeout)
+    try:
+        tool_state = await asyncio.wait_for(fn({**base_state, "tool_query": query}), timeout)
+        output = tool_state.get("tool_result") or tool_state.get("soil_nutrient_result") or {}
+        _store_output(tool_name, query, output)
+        return {"tool": tool_name, "query": query, "output": output}
+    except asyncio.TimeoutError:
+        return _timed_out(tool_name, query, timeout)
+    except Exception as e:
+        return {"tool": tool_name, "query": query, "output": {"error": str(e)}}
+    finally:
+        reset_deadline(token)
+
+async def _run_batch_tool_async(tool_name: str, queries: List[Any], timeout: float) -> List[Dict[str, Any]]:
+    outputs = [get_result_cache().get(tool_name, q) for q in queries]
+    todo = [i for i, out in enumerate(outputs) if out is None]
+    if todo:
+        token = set_deadline(time.monotonic() + timeout)
+        try:
+            fetched = await asyncio.wait_for(get_batch_tool(tool_name, use_async=True)([queries[i] for i in todo]), timeout)
+        except asyncio.TimeoutError:
+            fetched = [_timed_out(tool_name, queries[i], timeout)["output"] for i in todo]
+        except Exception as e:
+            fetched = [{"error": str(e)}] * len(todo)
+        finally:
+            reset_deadline(token)
+        for i, out in zip(todo, fetched):
+            outputs[i] = out
+            _store_output(tool_name, queries[i], out)
+    return [{"tool": tool_name, "query": q, "output": out} for q, out in zip(queries, outputs)]
+
+async def _run_job_async(job: List[int], plans: List[Dict[str, Any]], base_state: Dict[str, Any], timeout: float) -> List[Dict[str, Any]]:
+    if len(job) == 1:
+        p = plans[job[0]]
+        return [await _run_single_tool_async(p["tool_name"], p["tool_query"], base_state, timeout)]
+    return await _run_batch_tool_async(plans[job[0]]["tool_name"], [plans[i]["tool_query"] for i in job], timeout)
+
+async def multi_tool_node_async(state: Dict[str, Any]) -> Dict[str, Any]:
+    """Fans tools out on the event loop over the shared async HTTP client; no thread per call."""
+    plans = state.get("tools_to_call", [])
+    if not plans:
+        return state
 
-    return {**state, "tool_results": ordered}
+    # wait_for cancels each job at its deadline
+    limits = _deadlines(state, plans)
+    jobs = _tool_jobs(plans)
+    outputs = await asyncio.gather(*[_run_job_async(job, plans, state, limits[job[0]]) for job in jobs])
+    results: List[Any] = [None] * len(plans)
+    for job, job_results in zip(jobs, outputs):
+        for i, r in zip(job, job_results):
+            results[i] = r
+    timed_out = [r["tool"] for r in results if r["output"].get("timed_out")]
+    return {**state, "tool_results": results, "timed_out_tools": timed_out}
 
 # ====== Answer node (merges typed outputs) ======
-def answer_node(state: Dict[str, Any]) -> Dict[str, Any]:
-    llm = make_llm()
+# Total policy excerpt text in the answer prompt (the old 5 chunks x 300 chars), split over the chunks returned
+POLICY_EVIDENCE_CHARS = int(os.getenv("POLICY_EVIDENCE_CHARS", "1500"))
 
+
+def _answer_messages(state: Dict[str, Any]) -> List[Any]:
     # Build evidence text from labeled outputs
     parts: List[str] = []
     for item in state.get("tool_results", []):
@@ -541,11 +463,19 @@ def answer_node(state: Dict[str, Any]) -> Dict[str, Any]:
             if "error" in out:
                 parts.append(f"[policy_pdf] ({q}) ERROR: {out['error']}")
             else:
-                for r in out.get("results", []):
-                    src = (r.get("metadata", {}) or {}).get("source", "unknown")
+                results = out.get("results", [])
+                cap = POLICY_EVIDENCE_CHARS // max(1, len(results))
+                for r in results:
+                    meta = r.get("metadata", {}) or {}
+                    src = os.path.basename(str(meta.get("source", "unknown")))
+                    if meta.get("page") is not None:
+                        src += f" p.{int(meta['page']) + 1}"
+                    if meta.get("section"):
+                        src += f" §{meta['section']}"
+                    # Fewer chunks get longer excerpts; the prompt never carries more than the budget
                     preview = (r.get("content") or "").strip().replace("\n", " ")
-                    if len(preview) > 300:
-                        preview = preview[:300] + "..."
+                    if len(preview) > cap:
+                        preview = preview[:cap] + "..."
                     parts.append(f"[policy_pdf] {src}: {preview}")
 
         elif tname == "web_search":
@@ -571,9 +501,35 @@ def answer_node(state: Dict[str, Any]) -> Dict[str, Any]:
     context = "\n\n".join(parts)
     user_q = state.get("english_input") or state.get("user_input") or ""
     prompt = f"User question: {user_q}\n\nAvailable evidence (may be partial):\n{context}\n\nCompose a concise, actionable answer. If data is missing, say what is missing and suggest how to get it."
+    if state.get("timed_out_tools"):
+        missing = ", ".join(sorted(set(state["timed_out_tools"])))
+        prompt += f"\n\nThese sources did not respond in time and returned no data: {missing}. Tell the user this data is temporarily unavailable."
 
-    msgs = [SystemMessage(content="You are Krishi GPT, a farmer's helper which uses different tools attached to you and provide short solutions."), HumanMessage(content=prompt)]
-    out = llm.invoke(msgs).content.strip()
+    return [SystemMessage(content="You are Krishi GPT, a farmer's helper which uses different tools attached to you and provide short solutions."), HumanMessage(content=prompt)]
+
+def answer_node(state: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Streams the completion so graph.stream(stream_mode="messages") can surface
+    tokens as they arrive; the joined text is still returned as final_answer.
+    """
+    llm = make_llm()
+    msgs = _answer_messages(state)
+    pieces: List[str] = []
+    for chunk in llm.stream(msgs):
+        if chunk.content:
+            pieces.append(chunk.content)
+    out = "".join(pieces).strip()
+
+    return {**state, "final_answer": out}
+
+async def answer_node_async(state: Dict[str, Any]) -> Dict[str, Any]:
+    llm = make_llm()
+    msgs = _answer_messages(state)
+    pieces: List[str] = []
+    async for chunk in llm.astream(msgs):
+        if chunk.content:
+            pieces.append(chunk.content)
+    out = "".join(pieces).strip()
 
     return {**state, "final_answer": out}
 
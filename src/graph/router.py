@@ -0,0 +1,320 @@
+import os
+import re
+import math
+import threading
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..tools.config import INDIA_STATES_UTS
+from ..tools.utils import extract_city_for_weather, extract_mandi_state_commodity
+
+# ====== Local fast-path router ======
+FAST_ROUTER_ENABLED = os.getenv("FAST_ROUTER_ENABLED", "1") == "1"
+ROUTER_CONFIDENCE_THRESHOLD = float(os.getenv("ROUTER_CONFIDENCE_THRESHOLD", "0.75"))
+
+# Named schemes/portals: questions about different ones never share an answer
+SCHEME_NAMES: List[str] = ["pm-kisan", "pm kisan", "pmfby", "pmksy", "enam", "e-nam", "atma", "midh", "aif",
+                           "soil health card", "agmarknet", "mkisan"]
+
+# Keyword rules of the planner's fallback (keyword_plan) when its JSON is unusable.
+# Matched as whole words, so inflected forms are listed explicitly ("act" must not hit "actually")
+TOOL_KEYWORDS: Dict[str, List[str]] = {
+    "weather": ["weather", "temperature", "temperatures", "rain", "rains", "raining", "rainfall",
+                "forecast", "forecasts"],
+    "mandi_price": ["mandi", "mandis", "market price", "market prices", "crop price", "crop prices",
+                    "vegetable price", "vegetable prices", "commodity price", "commodity prices"],
+    "policy_pdf": ["policy", "policies", "scheme", "schemes", "act", "acts", "government"],
+    "soil_nutrient": ["soil", "soils", "nutrient", "nutrients", "soil health", "fertility", "nitrogen",
+                      "phosphorus", "potassium"],
+    "web_search": ["latest", "news", "update", "updates"],
+}
+
+# Extra fast-path features and their weight (a TOOL_KEYWORDS hit weighs 1.0). Broad terms
+# such as "price" or "rate" also show up in loan and fuel questions, so they weigh less.
+FAST_KEYWORDS: Dict[str, Dict[str, float]] = {
+    "weather": {"humidity": 1.0},
+    "mandi_price": {"bhav": 0.8, "price": 0.6, "prices": 0.6, "rate": 0.5, "rates": 0.5},
+    "policy_pdf": {**{name: 1.0 for name in SCHEME_NAMES}, "yojana": 0.8, "yojanas": 0.8,
+                   "subsidy": 0.7, "subsidies": 0.7, "eligibility": 0.6, "eligible": 0.6},
+}
+
+# Commodities the mandi tool is fast-routed for; anything else ("tractor", "diesel") goes to the LLM
+KNOWN_COMMODITIES = {
+    "wheat", "paddy", "rice", "maize", "bajra", "jowar", "ragi", "barley", "gram", "chana", "tur", "arhar",
+    "moong", "urad", "masoor", "lentil", "mustard", "groundnut", "soybean", "soyabean", "sunflower", "sesamum",
+    "castor seed", "cotton", "jute", "sugarcane", "guar seed", "cumin seed", "jeera", "coriander", "turmeric",
+    "chilli", "red chilli", "green chilli", "garlic", "ginger", "onion", "potato", "tomato", "brinjal",
+    "cabbage", "cauliflower", "okra", "bhindi", "carrot", "peas", "banana", "apple", "mango", "grapes",
+    "pomegranate", "orange", "coconut", "copra", "arecanut", "cardamom", "black pepper", "tea", "coffee",
+}
+
+# Places the weather fast path trusts outright; other place names lower the confidence a little
+KNOWN_CITIES = {
+    "delhi", "new delhi", "mumbai", "pune", "nagpur", "nashik", "kolkata", "chennai", "bengaluru", "bangalore",
+    "hyderabad", "ahmedabad", "surat", "rajkot", "jaipur", "jodhpur", "kota", "bikaner", "lucknow", "kanpur",
+    "varanasi", "agra", "meerut", "patna", "gaya", "muzaffarpur", "bhagalpur", "ranchi", "bhopal", "indore",
+    "gwalior", "jabalpur", "raipur", "bhubaneswar", "cuttack", "guwahati", "chandigarh", "ludhiana", "amritsar",
+    "jalandhar", "bathinda", "dehradun", "shimla", "srinagar", "jammu", "thiruvananthapuram", "kochi",
+    "coimbatore", "madurai", "visakhapatnam", "vijayawada", "guntur", "mysuru", "hubli", "belagavi",
+}
+
+# Small labelled seed set for the TF-IDF classifier; "none" = answer without tools
+SEED_EXAMPLES: Dict[str, List[str]] = {
+    "weather": [
+        "weather in patna", "what is the temperature in jaipur today", "will it rain in nagpur",
+        "current weather at lucknow", "humidity and wind in indore now", "is it hot in delhi",
+        "rain forecast for pune", "temperature today in ludhiana",
+    ],
+    "mandi_price": [
+        "wheat price in rajasthan", "mandi rate of onion in maharashtra", "tomato prices in karnataka mandi",
+        "current market price of mustard in rajasthan", "what is the rate for soybean in madhya pradesh",
+        "cotton mandi bhav gujarat", "paddy price in punjab market", "potato rate in uttar pradesh",
+    ],
+    "policy_pdf": [
+        "pm-kisan eligibility", "pmfby claim process", "how to apply for pmksy drip irrigation subsidy",
+        "soil health card scheme guidelines", "enam registration for farmers", "atma scheme benefits",
+        "agriculture infrastructure fund loan interest subvention", "midh horticulture subsidy guidelines",
+        "government scheme for organic farming", "crop insurance policy premium",
+    ],
+    "soil_nutrient": [
+        "soil nutrient status in bihar", "nitrogen levels in soil of punjab", "soil health data for patna district",
+        "phosphorus deficiency in haryana soils", "potassium status of soil in odisha",
+        "soil fertility of karnataka", "organic carbon in soil of gujarat",
+    ],
+    "web_search": [
+        "latest msp update", "monsoon news today", "new agriculture news", "latest update on fertilizer prices",
+        "recent government announcement for farmers", "news about locust attack",
+    ],
+    "none": [
+        "how to control aphids on mustard", "best time to sow wheat", "what fertilizer for paddy",
+        "how to treat leaf blight in tomato", "how much water does sugarcane need", "which variety of rice is best",
+        "how to make compost at home", "intercropping ideas for small farm",
+    ],
+}
+
+# Words that end a place name after "in/at/for" ("rain in patna this evening", "delhi right now")
+_PLACE_STOPWORDS = {
+    "today", "tonight", "now", "right", "currently", "tomorrow", "yesterday", "this", "next", "coming",
+    "morning", "afternoon", "evening", "night", "week", "weekend", "month", "please", "forecast",
+    "weather", "temperature", "humidity", "rain", "will", "is", "does", "expected",
+}
+# A place followed by one of these names a second place or question: left to the planner LLM
+_PLACE_CONJUNCTIONS = {"and", "or", "but", "vs", "versus", "with", "also", "&"}
+# Never a place: determiners, pronouns, times of day and generic nouns ("in my village", "at noon", "for sowing")
+_NOT_PLACES = {
+    "the", "a", "an", "my", "our", "your", "his", "her", "their", "its", "this", "that", "these", "those",
+    "me", "us", "him", "them", "it", "here", "there", "which", "what", "some", "any", "every", "all",
+    "noon", "midnight", "dawn", "dusk", "sunrise", "sunset", "day", "days", "hour", "hours", "moment",
+    "time", "season", "monsoon", "kharif", "rabi", "zaid", "summer", "winter", "spring", "autumn",
+    "village", "city", "town", "area", "region", "place", "district", "state", "country", "home", "location",
+    "farm", "field", "fields", "crop", "crops", "garden", "sowing", "harvest", "irrigation", "spraying",
+}
+_PLACE_MAX_WORDS = 3
+_UNKNOWN_PLACE_STRENGTH = 0.9  # confidence factor for a plausible but unlisted place name
+
+_STATS_LOCK = threading.Lock()
+_STATS = {"total": 0, "fast_path": 0, "llm": 0, "fast_confidence_sum": 0.0, "last_confidence": 0.0}
+
+
+def _tokens(text: str) -> List[str]:
+    words = re.findall(r"[a-z0-9]+(?:-[a-z0-9]+)?", (text or "").lower())
+    return words + [f"{a}_{b}" for a, b in zip(words, words[1:])]
+
+
+class _TfidfCentroids:
+    """Tiny TF-IDF nearest-centroid classifier over the seed examples (no external deps)."""
+
+    def __init__(self, examples: Dict[str, List[str]]):
+        docs = [(label, Counter(_tokens(t))) for label, texts in examples.items() for t in texts]
+        df = Counter(tok for _, tf in docs for tok in tf)
+        n = len(docs)
+        self.idf = {tok: math.log((1 + n) / (1 + c)) + 1.0 for tok, c in df.items()}
+        self.centroids: Dict[str, Dict[str, float]] = {}
+        for label in examples:
+            acc: Counter = Counter()
+            for lbl, tf in docs:
+                if lbl == label:
+                    for tok, w in self._vector(tf).items():
+                        acc[tok] += w
+            self.centroids[label] = self._normalize(acc)
+
+    def _vector(self, tf: Counter) -> Dict[str, float]:
+        return self._normalize({tok: c * self.idf[tok] for tok, c in tf.items() if tok in self.idf})
+
+    @staticmethod
+    def _normalize(vec) -> Dict[str, float]:
+        norm = math.sqrt(sum(w * w for w in vec.values())) or 1.0
+        return {k: w / norm for k, w in vec.items()}
+
+    def scores(self, text: str) -> Dict[str, float]:
+        q = self._vector(Counter(_tokens(text)))
+        return {label: sum(w * c.get(tok, 0.0) for tok, w in q.items()) for label, c in self.centroids.items()}
+
+
+_CLASSIFIER = _TfidfCentroids(SEED_EXAMPLES)
+
+
+def _has_keyword(txt: str, keywords: List[str]) -> bool:
+    return any(re.search(rf"\b{re.escape(k)}\b", txt) for k in keywords)
+
+
+def _find_state(txt: str) -> Optional[str]:
+    # Longest match first so "west bengal" wins over "bengal"-like substrings
+    for st in sorted(INDIA_STATES_UTS, key=len, reverse=True):
+        if re.search(rf"\b{re.escape(st)}\b", txt):
+            return st
+    return None
+
+
+def keyword_plan(user_q: str) -> List[Dict[str, Any]]:
+    """Coarse keyword routing; the planner's fallback when LLM JSON fails."""
+    txt = (user_q or "").lower()
+    tools_to_call: List[Dict[str, Any]] = []
+    if _has_keyword(txt, TOOL_KEYWORDS["weather"]):
+        tools_to_call.append({"tool_name": "weather", "tool_query": extract_city_for_weather(user_q)})
+    if _has_keyword(txt, TOOL_KEYWORDS["mandi_price"]):
+        st, com = extract_mandi_state_commodity(user_q)
+        tools_to_call.append({"tool_name": "mandi_price", "tool_query": f"{st},{com}"})
+    if _has_keyword(txt, TOOL_KEYWORDS["policy_pdf"]):
+        tools_to_call.append({"tool_name": "policy_pdf", "tool_query": user_q})
+    if _has_keyword(txt, TOOL_KEYWORDS["soil_nutrient"]):
+        payload = {"cycle": "2025-26"}
+        found_state = _find_state(txt)
+        if found_state:
+            payload["state_name"] = found_state
+        tools_to_call.append({"tool_name": "soil_nutrient", "tool_query": payload})
+    if _has_keyword(txt, TOOL_KEYWORDS["web_search"]):
+        tools_to_call.append({"tool_name": "web_search", "tool_query": user_q})
+    return tools_to_call
+
+
+def _mandi_args(txt: str) -> Optional[str]:
+    state_name = _find_state(txt)
+    if not state_name:
+        return None
+    # Longest first so "red chilli" wins over "chilli"
+    for commodity in sorted(KNOWN_COMMODITIES, key=len, reverse=True):
+        if re.search(rf"\b{re.escape(commodity)}\b", txt):
+            return f"{state_name.title()},{commodity.title()}"
+    return None
+
+
+def _weather_place(txt: str) -> Optional[str]:
+    """The single place named after "in/at/for", or None when it is missing, ambiguous or not a place."""
+    m = re.search(r"\b(?:in|at|for)\s+(.+)", txt)
+    if not m:
+        return None
+    words = []
+    for tok in re.findall(r"[a-z][a-z.'-]*|[^\sa-z]", m.group(1)):
+        if tok in _PLACE_CONJUNCTIONS:
+            return None
+        if tok in _PLACE_STOPWORDS or not tok[0].isalpha():
+            break
+        word = tok.strip(".'-")
+        if word in _NOT_PLACES or word.endswith("ing"):
+            return None
+        words.append(word)
+    if not words or len(words) > _PLACE_MAX_WORDS:
+        return None
+    return " ".join(words).title()
+
+
+def _confident_args(tool: str, user_q: str) -> Optional[Tuple[Any, float]]:
+    """
+    (tool arguments, strength) when they can be extracted unambiguously,
+    else None. Strength < 1 scales the route confidence down.
+    """
+    txt = user_q.lower()
+    if tool == "weather":
+        place = _weather_place(txt)
+        if not place:
+            return None
+        known = place.lower() in KNOWN_CITIES or place.lower() in INDIA_STATES_UTS
+        return place, 1.0 if known else _UNKNOWN_PLACE_STRENGTH
+    if tool == "mandi_price":
+        args = _mandi_args(txt)
+        return (args, 1.0) if args else None
+    if tool == "soil_nutrient":
+        found_state = _find_state(txt)
+        return ({"cycle": "2025-26", "state_name": found_state.title()}, 1.0) if found_state else None
+    if tool in ("policy_pdf", "web_search"):
+        return user_q, 1.0
+    return None
+
+
+def _keyword_weights(txt: str) -> Dict[str, float]:
+    """Strongest keyword feature per tool: 1.0 for a TOOL_KEYWORDS hit, else the FAST_KEYWORDS weight."""
+    weights: Dict[str, float] = {}
+    for tool in TOOL_KEYWORDS:
+        w = 1.0 if _has_keyword(txt, TOOL_KEYWORDS[tool]) else 0.0
+        for kw, kw_weight in FAST_KEYWORDS.get(tool, {}).items():
+            if kw_weight > w and _has_keyword(txt, [kw]):
+                w = kw_weight
+        if w:
+            weights[tool] = w
+    return weights
+
+
+def fast_route(user_q: str) -> Optional[Dict[str, Any]]:
+    """
+    Returns {"tools_to_call": [...], "confidence": float} when the local
+    classifier is confident enough to skip the planner LLM, else None.
+
+    Per tool: confidence = (0.5 * keyword weight + 0.5 * tfidf / best tfidf)
+    * argument strength, scaled down when a tool outside the plan scores
+    close to the best one.
+    """
+    if not FAST_ROUTER_ENABLED or not (user_q or "").strip():
+        return None
+
+    txt = user_q.lower()
+    scores = _CLASSIFIER.scores(user_q)
+    best = max(scores.values()) or 0.0
+    weights = _keyword_weights(txt)
+    planned = list(weights)
+
+    confidence = 0.0
+    tools_to_call: List[Dict[str, Any]] = []
+    if planned and best > 0:
+        per_tool = []
+        for tool in planned:
+            extracted = _confident_args(tool, user_q)
+            if extracted is None:
+                per_tool = []
+                break
+            args, strength = extracted
+            tools_to_call.append({"tool_name": tool, "tool_query": args})
+            per_tool.append((0.5 * weights[tool] + 0.5 * scores.get(tool, 0.0) / best) * strength)
+        if per_tool:
+            rival = max((s for t, s in scores.items() if t not in planned), default=0.0) / best
+            confidence = min(per_tool) * (1.0 - 0.5 * rival)
+
+    routed = confidence >= ROUTER_CONFIDENCE_THRESHOLD
+    with _STATS_LOCK:
+        _STATS["total"] += 1
+        _STATS["last_confidence"] = confidence
+        if routed:
+            _STATS["fast_path"] += 1
+            _STATS["fast_confidence_sum"] += confidence
+        else:
+            _STATS["llm"] += 1
+
+    if not routed:
+        return None
+    return {"tools_to_call": tools_to_call, "confidence": confidence}
+
+
+def router_stats() -> Dict[str, Any]:
+    """Short-circuit rate and confidence figures since process start."""
+    with _STATS_LOCK:
+        s = dict(_STATS)
+    total = s["total"] or 1
+    return {
+        "total": s["total"],
+        "fast_path": s["fast_path"],
+        "llm": s["llm"],
+        "short_circuit_rate": s["fast_path"] / total,
+        "avg_fast_confidence": s["fast_confidence_sum"] / s["fast_path"] if s["fast_path"] else 0.0,
+        "last_confidence": s["last_confidence"],
+        "threshold": ROUTER_CONFIDENCE_THRESHOLD,
+    }
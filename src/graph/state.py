@@ -9,6 +9,11 @@ class AgentState(TypedDict, total=False):
     need_tool: bool
     tools_to_call: List[Dict[str, Any]]   
     tool_results: List[Dict[str, Any]]    
+    route_source: str                     # "fast_path" (local router) or "llm"
+    route_confidence: float
+    tool_budget_s: float                  # optional per-request override of TOOL_BUDGET_SECONDS
+    timed_out_tools: List[str]
 
     # Final
     final_answer: str
+    answer_cache: Dict[str, Any]          # set when served from the semantic answer cache
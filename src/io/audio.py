@@ -1,23 +1,60 @@
-import tempfile
+import io
 import os
+import threading
 try:
     from faster_whisper import WhisperModel
     FWHISPER_AVAILABLE = True
 except Exception:
     FWHISPER_AVAILABLE = False
 
+WHISPER_MODEL_SIZE = os.getenv("WHISPER_MODEL_SIZE", "small")
+WHISPER_DEVICE = os.getenv("WHISPER_DEVICE", "cpu")
+WHISPER_COMPUTE_TYPE = os.getenv("WHISPER_COMPUTE_TYPE", "int8")
+WHISPER_CPU_THREADS = int(os.getenv("WHISPER_CPU_THREADS", "0"))  # 0 = library default
+WHISPER_NUM_WORKERS = int(os.getenv("WHISPER_NUM_WORKERS", "1"))  # concurrent transcriptions
+
+_MODEL = None
+_MODEL_LOCK = threading.Lock()
+_WARMUP_THREAD = None
+_WARMUP_LOCK = threading.Lock()  # separate from _MODEL_LOCK so callers never wait on the load
+
+
+def get_whisper_model():
+    """Loads the Whisper model once per process; later calls reuse it."""
+    global _MODEL
+    if _MODEL is None:
+        with _MODEL_LOCK:
+            if _MODEL is None:
+                _MODEL = WhisperModel(
+                    WHISPER_MODEL_SIZE,
+                    device=WHISPER_DEVICE,
+                    compute_type=WHISPER_COMPUTE_TYPE,
+                    cpu_threads=WHISPER_CPU_THREADS,
+                    num_workers=WHISPER_NUM_WORKERS,
+                )
+    return _MODEL
+
+
+def warm_up_whisper(background: bool = True) -> None:
+    """Loads the model ahead of the first upload; safe to call on every Streamlit rerun."""
+    global _WARMUP_THREAD
+    if not FWHISPER_AVAILABLE or _MODEL is not None:
+        return
+    if not background:
+        get_whisper_model()
+        return
+    with _WARMUP_LOCK:
+        if _WARMUP_THREAD is None:
+            _WARMUP_THREAD = threading.Thread(target=get_whisper_model, name="whisper-warmup", daemon=True)
+            _WARMUP_THREAD.start()
+
+
 def transcribe_audio_file(file_bytes: bytes, lang_hint=None) -> str:
     if not FWHISPER_AVAILABLE:
         return "[Audio transcription unavailable: please install faster-whisper]"
-    with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tmp:
-        tmp.write(file_bytes)
-        tmp_path = tmp.name
 
-    model = WhisperModel("small", device="cpu", compute_type="int8")
-    segments, _ = model.transcribe(tmp_path, language=lang_hint)
+    model = get_whisper_model()
+    # faster-whisper decodes file-like objects directly; no temp file round trip
+    segments, _ = model.transcribe(io.BytesIO(file_bytes), language=lang_hint)
     texts = [seg.text for seg in segments]
-    try:
-        os.remove(tmp_path)
-    except Exception:
-        pass
     return " ".join(texts).strip()
@@ -1,23 +1,120 @@
 import io
-from typing import List
+import os
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, Optional
 from PyPDF2 import PdfReader
-from pdf2image import convert_from_bytes
+from pdf2image import convert_from_bytes, pdfinfo_from_bytes
 from .ocr import ocr_image_to_text
 
-def extract_text_from_pdf(file_bytes: bytes) -> str:
-    text_parts: List[str] = []
+# OCR fallback for scanned PDFs: one page rasterized per worker at a time.
+# Capped by default: each worker holds a rendered page and a tesseract process.
+OCR_WORKERS = int(os.getenv("OCR_WORKERS", str(max(1, min(4, (os.cpu_count() or 2) - 1)))))
+OCR_DPI = int(os.getenv("OCR_DPI", "200"))
+
+_WORKER_PDF: Optional[bytes] = None
+
+# Never fork: the Streamlit server is multi-threaded, and a forked child can
+# inherit locks held by other threads (HTTP pools, model loads) and deadlock.
+_MP_CONTEXT = multiprocessing.get_context(
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+
+
+def _init_ocr_worker(file_bytes: bytes) -> None:
+    # Ship the PDF to each worker once instead of pickling it per page
+    global _WORKER_PDF
+    _WORKER_PDF = file_bytes
+
+
+def _ocr_page(page_no: int, file_bytes: Optional[bytes] = None) -> str:
+    images = convert_from_bytes(
+        file_bytes if file_bytes is not None else _WORKER_PDF,
+        dpi=OCR_DPI, fmt="png", first_page=page_no, last_page=page_no,
+    )
+    return "\n\n".join(ocr_image_to_text(img) for img in images)
+
+
+def _page_count(file_bytes: bytes) -> int:
+    try:
+        return int(pdfinfo_from_bytes(file_bytes)["Pages"])
+    except Exception:
+        return len(PdfReader(io.BytesIO(file_bytes)).pages)
+
+
+def iter_ocr_pages(file_bytes: bytes, workers: Optional[int] = None) -> Iterator[str]:
+    """
+    OCRs pages in a process pool and yields their text in page order.
+    At most `workers` pages are rasterized at once, so peak memory is
+    bounded by the worker count rather than the page count.
+    """
+    workers = max(1, workers or OCR_WORKERS)
+    pages = _page_count(file_bytes)
+
+    if workers == 1 or pages <= 1:
+        for page_no in range(1, pages + 1):
+            yield _ocr_page(page_no, file_bytes)
+        return
+
+    ex = ProcessPoolExecutor(
+        max_workers=workers, mp_context=_MP_CONTEXT, initializer=_init_ocr_worker, initargs=(file_bytes,),
+    )
+    try:
+        pending = deque()
+        next_page = 1
+        while next_page <= pages or pending:
+            while next_page <= pages and len(pending) < workers:
+                pending.append(ex.submit(_ocr_page, next_page))
+                next_page += 1
+            yield pending.popleft().result()
+    finally:
+        # Also runs when the caller stops iterating early
+        ex.shutdown(wait=False, cancel_futures=True)
+
+
+def _iter_text_layer(file_bytes: bytes) -> Iterator[str]:
     try:
         reader = PdfReader(io.BytesIO(file_bytes))
         for page in reader.pages:
             page_text = page.extract_text() or ""
             if page_text.strip():
-                text_parts.append(page_text)
+                yield page_text
     except Exception:
-        pass
+        return
+
+
+def _take(pages: Iterator[str], max_pages: Optional[int], max_chars: Optional[int]) -> Iterator[str]:
+    count = 0
+    chars = 0
+    try:
+        for page_text in pages:
+            if max_chars is not None and chars + len(page_text) >= max_chars:
+                yield page_text[:max_chars - chars]
+                return
+            yield page_text
+            count += 1
+            chars += len(page_text)
+            if max_pages is not None and count >= max_pages:
+                return
+    finally:
+        # Stop the underlying extractor (and any OCR pool) right away
+        pages.close()
+
+
+def iter_pdf_text(file_bytes: bytes, max_pages: Optional[int] = None, max_chars: Optional[int] = None) -> Iterator[str]:
+    """
+    Yields page text lazily: the text layer when the PDF has one, otherwise
+    OCR. Stops after max_pages pages or max_chars characters (the last page
+    is truncated to fit), so callers only pay for the pages they use.
+    """
+    found_text = False
+    for page_text in _take(_iter_text_layer(file_bytes), max_pages, max_chars):
+        found_text = True
+        yield page_text
+    if not found_text:
+        yield from _take(iter_ocr_pages(file_bytes), max_pages, max_chars)
 
-    if text_parts:
-        return "\n\n".join(text_parts).strip()
 
-    images = convert_from_bytes(file_bytes, fmt="png")
-    ocr_texts = [ocr_image_to_text(img) for img in images]
-    return "\n\n".join(ocr_texts).strip()
+def extract_text_from_pdf(file_bytes: bytes, max_pages: Optional[int] = None, max_chars: Optional[int] = None) -> str:
+    return "\n\n".join(iter_pdf_text(file_bytes, max_pages=max_pages, max_chars=max_chars)).strip()
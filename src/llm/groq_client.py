@@ -1,12 +1,88 @@
 import os
+import asyncio
+import threading
+import weakref
+from typing import Any, Dict, Optional, Tuple
+
+import httpx
 from langchain_groq import ChatGroq
 
 #DEFAULT_GROQ_MODEL = "llama-3.1-8b-instant"
 DEFAULT_GROQ_MODEL = "openai/gpt-oss-120b"
 #DEFAULT_GROQ_MODEL= "qwen/qwen3-32b"
 
-def make_llm(model: str = DEFAULT_GROQ_MODEL) -> ChatGroq:
+# ====== Connection pool shared by every ChatGroq instance ======
+LLM_POOL_MAX_CONNECTIONS = int(os.getenv("LLM_POOL_MAX_CONNECTIONS", "32"))
+LLM_POOL_MAX_KEEPALIVE = int(os.getenv("LLM_POOL_MAX_KEEPALIVE", "16"))
+LLM_POOL_KEEPALIVE_EXPIRY = float(os.getenv("LLM_POOL_KEEPALIVE_EXPIRY", "60"))
+
+_LOCK = threading.Lock()
+_HTTP_CLIENT = None
+_REGISTRY: Dict[Tuple[Any, ...], ChatGroq] = {}
+# httpx.AsyncClient connections belong to the loop that opened them: one client
+# (and one set of ChatGroq instances) per running event loop
+_LOOP_CLIENTS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+_LOOP_REGISTRIES: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Tuple[Any, ...], ChatGroq]]" = weakref.WeakKeyDictionary()
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=LLM_POOL_MAX_CONNECTIONS,
+        max_keepalive_connections=LLM_POOL_MAX_KEEPALIVE,
+        keepalive_expiry=LLM_POOL_KEEPALIVE_EXPIRY,
+    )
+
+
+def _http_client() -> httpx.Client:
+    global _HTTP_CLIENT
+    if _HTTP_CLIENT is None:
+        _HTTP_CLIENT = httpx.Client(limits=_limits())
+    return _HTTP_CLIENT
+
+
+def _running_loop() -> Optional[asyncio.AbstractEventLoop]:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+def _async_client(loop: asyncio.AbstractEventLoop) -> httpx.AsyncClient:
+    client = _LOOP_CLIENTS.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(limits=_limits())
+        _LOOP_CLIENTS[loop] = client
+    return client
+
+
+def make_llm(model: str = DEFAULT_GROQ_MODEL, **params: Any) -> ChatGroq:
+    """
+    Returns a process-wide ChatGroq for (model, params), created on first use.
+    All instances share one keep-alive connection pool, so repeated calls
+    (and ThreadPoolExecutor workers) reuse open TLS connections. Called
+    inside a running event loop, it returns an instance whose async pool
+    belongs to that loop.
+    """
     api_key = os.getenv("GROQ_API_KEY")
     if not api_key:
         raise RuntimeError("GROQ_API_KEY not set.")
-    return ChatGroq(api_key=api_key, model=model)
+
+    key = (api_key, model, tuple(sorted(params.items())))
+    loop = _running_loop()
+    registry = _REGISTRY if loop is None else _LOOP_REGISTRIES.setdefault(loop, {})
+    llm = registry.get(key)
+    if llm is not None:
+        return llm
+
+    with _LOCK:
+        llm = registry.get(key)
+        if llm is None:
+            llm = ChatGroq(
+                api_key=api_key,
+                model=model,
+                http_client=_http_client(),
+                http_async_client=_async_client(loop) if loop is not None else None,
+                **params,
+            )
+            registry[key] = llm
+    return llm
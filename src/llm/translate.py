@@ -0,0 +1,121 @@
+import os
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from langdetect import detect
+from langchain.schema import SystemMessage, HumanMessage
+from .groq_client import make_llm
+
+# ====== Translation cache ======
+TRANSLATION_CACHE_SIZE = int(os.getenv("TRANSLATION_CACHE_SIZE", "512"))
+TRANSLATION_CACHE_DIR = os.getenv("TRANSLATION_CACHE_DIR", "")  # empty = memory only
+
+_LRU: "OrderedDict[str, Tuple[str, str]]" = OrderedDict()  # key -> (lang, english)
+_LOCK = threading.Lock()
+
+
+def normalize_text(text: str) -> str:
+    return " ".join((text or "").split())
+
+
+def text_key(text: str) -> str:
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+def _disk_path(key: str) -> Optional[str]:
+    if not TRANSLATION_CACHE_DIR:
+        return None
+    return os.path.join(TRANSLATION_CACHE_DIR, key[:2], f"{key}.json")
+
+
+def _cache_get(key: str) -> Optional[Tuple[str, str]]:
+    with _LOCK:
+        hit = _LRU.get(key)
+        if hit is not None:
+            _LRU.move_to_end(key)
+            return hit
+
+    path = _disk_path(key)
+    if path and os.path.exists(path):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                j = json.load(f)
+            hit = (j["language"], j["english"])
+        except Exception:
+            return None
+        _cache_put(key, hit, persist=False)
+        return hit
+    return None
+
+
+def _cache_put(key: str, value: Tuple[str, str], persist: bool = True) -> None:
+    with _LOCK:
+        _LRU[key] = value
+        _LRU.move_to_end(key)
+        while len(_LRU) > TRANSLATION_CACHE_SIZE:
+            _LRU.popitem(last=False)
+
+    path = _disk_path(key)
+    if persist and path:
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"language": value[0], "english": value[1]}, f, ensure_ascii=False)
+            os.replace(tmp, path)
+        except Exception:
+            pass
+
+
+def autodetect_lang(text: str) -> str:
+    try:
+        return detect(text)
+    except Exception:
+        return "en"
+
+
+def translate_to_english(text: str, source_lang: str) -> str:
+    if not text.strip():
+        return ""
+    if source_lang == "en":
+        return text.strip()
+    llm = make_llm()
+    system = "Translate the following text to English, preserving meaning."
+    msgs = [SystemMessage(content=system), HumanMessage(content=text)]
+    return llm.invoke(msgs).content.strip()
+
+
+def detect_and_translate(text: str) -> Tuple[str, str]:
+    """
+    Returns (language, english_text), keyed by a hash of the normalized text.
+    English input never reaches the LLM.
+    """
+    norm = normalize_text(text)
+    if not norm:
+        return "en", ""
+
+    key = text_key(norm)
+    hit = _cache_get(key)
+    if hit is not None:
+        return hit
+
+    lang = autodetect_lang(norm)
+    english = translate_to_english(norm, lang)
+    _cache_put(key, (lang, english))
+    return lang, english
+
+
+def remember_translation(text: str, language: str, english: str) -> None:
+    """Seeds the cache with a translation produced elsewhere (e.g. the combined translate+plan node)."""
+    norm = normalize_text(text)
+    if norm and english:
+        _cache_put(text_key(norm), (language or "en", english))
+
+
+def lookup_translation(text: str) -> Optional[Tuple[str, str]]:
+    """Cached (language, english) for text, without calling the LLM."""
+    norm = normalize_text(text)
+    return _cache_get(text_key(norm)) if norm else None
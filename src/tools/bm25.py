@@ -0,0 +1,124 @@
+import os
+import re
+import json
+import math
+import threading
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+from .config import VECTOR_DB_DIR
+from .vector_db import get_policy_vector_db, index_fingerprint
+
+BM25_FILE = "bm25.json"
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+_STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "can", "do", "does", "for", "from", "how", "i", "in", "is",
+    "it", "me", "my", "of", "on", "or", "the", "to", "under", "what", "which", "who", "with",
+}
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_COMPOUND_RE = re.compile(r"[a-z0-9]+(?:[-/.][a-z0-9]+)+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased word tokens; 'PM-KISAN' also yields 'pmkisan' so either spelling matches."""
+    text = (text or "").lower()
+    tokens = [t for t in _TOKEN_RE.findall(text) if t not in _STOPWORDS]
+    tokens.extend(re.sub(r"[-/.]", "", m) for m in _COMPOUND_RE.findall(text))
+    return tokens
+
+
+class BM25Index:
+    """Okapi BM25 over an inverted index; scoring only touches postings of the query terms."""
+
+    def __init__(self, ids: List[str], texts: List[str], metadatas: List[Dict[str, Any]],
+                 postings: Dict[str, List[List[int]]], doc_len: List[int], fingerprint: str = ""):
+        self.ids = ids
+        self.texts = texts
+        self.metadatas = metadatas
+        self.postings = postings  # term -> [[doc, tf], ...]
+        self.doc_len = doc_len
+        self.fingerprint = fingerprint
+        self.avg_len = (sum(doc_len) / len(doc_len)) if doc_len else 0.0
+        n = len(ids)
+        self.idf = {t: math.log(1 + (n - len(p) + 0.5) / (len(p) + 0.5)) for t, p in postings.items()}
+
+    @classmethod
+    def build(cls, ids: List[str], texts: List[str], metadatas: List[Dict[str, Any]], fingerprint: str = "") -> "BM25Index":
+        postings: Dict[str, List[List[int]]] = {}
+        doc_len = []
+        for doc, text in enumerate(texts):
+            counts = Counter(tokenize(text))
+            doc_len.append(sum(counts.values()))
+            for term, tf in counts.items():
+                postings.setdefault(term, []).append([doc, tf])
+        return cls(ids, texts, metadatas, postings, doc_len, fingerprint)
+
+    def search(self, query: str, k: int = 5) -> List[Tuple[int, float]]:
+        """(doc, score) pairs, best first."""
+        scores: Dict[int, float] = {}
+        for term in set(tokenize(query)):
+            idf = self.idf.get(term)
+            if idf is None:
+                continue
+            for doc, tf in self.postings[term]:
+                norm = tf + BM25_K1 * (1 - BM25_B + BM25_B * self.doc_len[doc] / self.avg_len)
+                scores[doc] = scores.get(doc, 0.0) + idf * tf * (BM25_K1 + 1) / norm
+        return sorted(scores.items(), key=lambda x: -x[1])[:k]
+
+    def covers(self, query: str, doc: int) -> bool:
+        """True when every known query term occurs in the document."""
+        terms = {t for t in tokenize(query) if t in self.postings}
+        return bool(terms) and terms <= set(tokenize(self.texts[doc]))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"fingerprint": self.fingerprint, "ids": self.ids, "texts": self.texts,
+                "metadatas": self.metadatas, "postings": self.postings, "doc_len": self.doc_len}
+
+
+# Lazy singleton, rebuilt whenever the vector index content changes
+_index: Optional[BM25Index] = None
+_LOCK = threading.Lock()
+
+
+def _bm25_path() -> str:
+    return os.path.join(VECTOR_DB_DIR, BM25_FILE)
+
+
+def _load(fingerprint: str) -> Optional[BM25Index]:
+    try:
+        with open(_bm25_path(), "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("fingerprint") == fingerprint:
+            return BM25Index(**data)
+    except Exception:
+        pass
+    return None
+
+
+def _save(index: BM25Index) -> None:
+    os.makedirs(VECTOR_DB_DIR, exist_ok=True)
+    tmp = _bm25_path() + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(index.to_dict(), f)
+    os.replace(tmp, _bm25_path())
+
+
+def get_lexical_index() -> BM25Index:
+    """BM25 over the same chunks as the Chroma store, persisted in VECTOR_DB_DIR."""
+    global _index
+    db = get_policy_vector_db()  # syncs the vector index first
+    fingerprint = index_fingerprint()
+    if _index is not None and _index.fingerprint == fingerprint:
+        return _index
+    with _LOCK:
+        if _index is not None and _index.fingerprint == fingerprint:
+            return _index
+        index = _load(fingerprint)
+        if index is None:
+            got = db.get(include=["documents", "metadatas"])
+            index = BM25Index.build(got.get("ids", []), [t or "" for t in got.get("documents", [])],
+                                    [m or {} for m in got.get("metadatas", [])], fingerprint)
+            _save(index)
+        _index = index
+    return _index
@@ -0,0 +1,89 @@
+import re
+from typing import Any, Callable, Dict, List, Optional
+
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+from .config import EMBED_MODEL_NAME, POLICY_CHUNK_TOKENS, POLICY_CHUNK_OVERLAP
+try:
+    from transformers import AutoTokenizer
+    TRANSFORMERS_AVAILABLE = True
+except Exception:
+    TRANSFORMERS_AVAILABLE = False
+
+# Headings in scheme guidelines: "3.2 Eligibility", "CHAPTER IV", "Annexure-II", or short ALL-CAPS lines
+_SECTION_RE = re.compile(
+    r"^\s*(?:(?:\d+(?:\.\d+){0,3}\.?\s+[A-Z][^\n]{2,80})"
+    r"|(?:(?:chapter|part|section|annexure|annex|appendix|schedule)\b[^\n]{0,80})"
+    r"|(?:[A-Z][A-Z0-9 ,&()/'-]{3,80}))\s*$",
+    re.IGNORECASE | re.MULTILINE,
+)
+
+_splitter = None
+
+
+def _token_length() -> Callable[[str], int]:
+    """Counts tokens with the embedding model's tokenizer; ~1.3 tokens/word without transformers."""
+    if TRANSFORMERS_AVAILABLE:
+        try:
+            tokenizer = AutoTokenizer.from_pretrained(EMBED_MODEL_NAME)
+            return lambda text: len(tokenizer.encode(text, add_special_tokens=False))
+        except Exception:
+            pass
+    return lambda text: int(len(text.split()) * 1.3) + 1
+
+
+def get_splitter() -> RecursiveCharacterTextSplitter:
+    global _splitter
+    if _splitter is None:
+        _splitter = RecursiveCharacterTextSplitter(
+            chunk_size=POLICY_CHUNK_TOKENS,
+            chunk_overlap=POLICY_CHUNK_OVERLAP,
+            length_function=_token_length(),
+            add_start_index=True,
+        )
+    return _splitter
+
+
+def chunking_signature() -> Dict[str, Any]:
+    """Stored in the index manifest; a change forces documents to be re-chunked."""
+    return {"model": EMBED_MODEL_NAME, "chunk_tokens": POLICY_CHUNK_TOKENS, "overlap": POLICY_CHUNK_OVERLAP}
+
+
+def _headings(text: str) -> List[tuple]:
+    # (offset, heading) in page order; ALL-CAPS check only applies when the
+    # line has no lowercase letters, since the regex is case-insensitive
+    found = []
+    for m in _SECTION_RE.finditer(text):
+        line = m.group(0).strip()
+        if re.match(r"^\d|^(chapter|part|section|annex|appendix|schedule)", line, re.IGNORECASE) or not re.search(r"[a-z]", line):
+            found.append((m.start(), line))
+    return found
+
+
+def chunk_documents(pages: List[Any]) -> List[Any]:
+    """
+    Splits loader pages into token-bounded chunks. Each chunk keeps the page
+    metadata and adds: section (nearest heading at or before the chunk,
+    carried across pages), chunk (index within the page) and start_index.
+    """
+    splitter = get_splitter()
+    chunks: List[Any] = []
+    section: Optional[str] = None
+    for page in pages:
+        text = page.page_content or ""
+        if not text.strip():
+            continue
+        heads = _headings(text)
+        page_chunks = splitter.split_documents([page])
+        for i, chunk in enumerate(page_chunks):
+            start = chunk.metadata.get("start_index", 0)
+            current = section
+            for offset, heading in heads:
+                if offset > start:
+                    break
+                current = heading
+            chunk.metadata["section"] = current or ""
+            chunk.metadata["chunk"] = i
+            chunks.append(chunk)
+        if heads:
+            section = heads[-1][1]
+    return chunks
@@ -3,6 +3,28 @@ import os
 # ====== Vector DB for PDFs ======
 PDF_FOLDER = os.getenv("POLICY_PDF_FOLDER", "Major Schemes")
 VECTOR_DB_DIR = os.getenv("POLICY_VECTOR_DB_DIR", "vector_db_policy")
+EMBED_MODEL_NAME = os.getenv("EMBED_MODEL_NAME", "sentence-transformers/all-MiniLM-L6-v2")
+
+# Chunking (in embedding-model tokens; MiniLM truncates input at 256)
+POLICY_CHUNK_TOKENS = int(os.getenv("POLICY_CHUNK_TOKENS", "200"))
+POLICY_CHUNK_OVERLAP = int(os.getenv("POLICY_CHUNK_OVERLAP", "30"))
+POLICY_EMBED_BATCH = int(os.getenv("POLICY_EMBED_BATCH", "64"))
+
+# Retrieval: "dense" (Chroma), "lexical" (BM25) or "hybrid" (both, merged by reciprocal rank)
+POLICY_SEARCH_MODE = os.getenv("POLICY_SEARCH_MODE", "hybrid")
+POLICY_LEXICAL_CANDIDATES = int(os.getenv("POLICY_LEXICAL_CANDIDATES", "20"))
+
+# ====== Per-tool deadlines (seconds) ======
+# The graph stops waiting for a tool after this long, and the tool's HTTP read
+# timeout is the same value, so an abandoned call frees its worker soon after.
+# Soil downloads the whole national dataset on a cold cache, so it gets the
+# longest deadline (still capped by TOOL_BUDGET_SECONDS) and is warmed at startup.
+TOOL_TIMEOUTS = {
+    name: float(os.getenv(f"TOOL_TIMEOUT_{name.upper()}", default))
+    for name, default in {
+        "web_search": "8", "weather": "5", "policy_pdf": "8", "mandi_price": "10", "soil_nutrient": "30",
+    }.items()
+}
 
 # ====== Weather API ======
 WEATHERAPI_KEY = os.getenv("OPENWEATHER_API_KEY", "75c43d92e1f8407590b205917251108")
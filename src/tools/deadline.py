@@ -0,0 +1,28 @@
+import time
+import contextvars
+from typing import Optional
+
+# ====== Deadline of the tool job running in this thread / task ======
+# Set by the graph's tool executor; read by HTTP timeouts and single-flight
+# waits so nothing a tool does outlives the time the graph will wait for it.
+# Threads started on their own (warm-up, background refresh) have no deadline.
+_DEADLINE: "contextvars.ContextVar[Optional[float]]" = contextvars.ContextVar("tool_deadline", default=None)
+MIN_WAIT = 0.1  # seconds; an expired deadline still gets one short attempt
+
+
+def set_deadline(at: Optional[float]) -> contextvars.Token:
+    """Sets the absolute time.monotonic() deadline; pass the token to reset_deadline."""
+    return _DEADLINE.set(at)
+
+
+def reset_deadline(token: contextvars.Token) -> None:
+    _DEADLINE.reset(token)
+
+
+def time_left(default: Optional[float] = None) -> Optional[float]:
+    """Seconds until the deadline (at least MIN_WAIT), capped by default; default when no deadline is set."""
+    at = _DEADLINE.get()
+    if at is None:
+        return default
+    left = max(MIN_WAIT, at - time.monotonic())
+    return left if default is None else min(left, default)
@@ -0,0 +1,62 @@
+import os
+import threading
+import importlib.util
+from typing import Any, Dict, Optional
+
+from langchain_community.embeddings import HuggingFaceEmbeddings
+from .config import EMBED_MODEL_NAME
+# Checked without importing: optimum.onnxruntime pulls in transformers, which
+# would put seconds on every cold start even with the torch backend
+ONNX_AVAILABLE = all(importlib.util.find_spec(m) is not None for m in ("onnxruntime", "optimum"))
+
+# "torch" (fp32 PyTorch) or "onnx" (int8-quantized ONNX Runtime, CPU)
+EMBED_BACKEND = os.getenv("EMBED_BACKEND", "torch")
+# Quantized exports shipped in the model repo: model_quint8_avx2 runs on any
+# modern x86; model_qint8_avx512(_vnni) / model_qint8_arm64 are faster where supported
+EMBED_ONNX_FILE = os.getenv("EMBED_ONNX_FILE", "onnx/model_quint8_avx2.onnx")
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "64"))
+
+_EMBEDDINGS = None
+_LOCK = threading.Lock()
+
+
+def _resolve_backend(backend: Optional[str]) -> str:
+    backend = backend or EMBED_BACKEND
+    return "torch" if backend == "onnx" and not ONNX_AVAILABLE else backend
+
+
+def make_embeddings(backend: Optional[str] = None, batch_size: Optional[int] = None) -> HuggingFaceEmbeddings:
+    """Builds a fresh embedding model; most callers want the shared get_embeddings()."""
+    if (backend or EMBED_BACKEND) == "onnx" and not ONNX_AVAILABLE:
+        print("⚠️ EMBED_BACKEND=onnx but optimum[onnxruntime] is not installed; using torch")
+    backend = _resolve_backend(backend)
+    model_kwargs: Dict[str, Any] = {"device": "cpu"}
+    if backend == "onnx":
+        try:
+            import optimum.onnxruntime  # noqa: F401
+        except Exception as e:
+            print(f"⚠️ ONNX embedding backend unavailable ({e}); using torch")
+            backend = "torch"
+    if backend == "onnx":
+        model_kwargs.update({"backend": "onnx", "model_kwargs": {"file_name": EMBED_ONNX_FILE}})
+    return HuggingFaceEmbeddings(
+        model_name=EMBED_MODEL_NAME,
+        model_kwargs=model_kwargs,
+        encode_kwargs={"batch_size": batch_size or EMBED_BATCH_SIZE},
+    )
+
+
+def get_embeddings() -> HuggingFaceEmbeddings:
+    """Process-wide embedding provider used for both index builds and query embedding."""
+    global _EMBEDDINGS
+    if _EMBEDDINGS is None:
+        with _LOCK:
+            if _EMBEDDINGS is None:
+                _EMBEDDINGS = make_embeddings()
+    return _EMBEDDINGS
+
+
+def embedding_signature() -> Dict[str, Any]:
+    """Stored in the index manifest; switching model or backend forces a re-embed."""
+    backend = _resolve_backend(None)
+    return {"model": EMBED_MODEL_NAME, "backend": backend, "onnx_file": EMBED_ONNX_FILE if backend == "onnx" else None}
@@ -0,0 +1,153 @@
+import os
+import random
+import asyncio
+import threading
+import weakref
+
+import httpx
+import requests
+import urllib3
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .config import TOOL_TIMEOUTS
+from .deadline import time_left
+
+# ====== Uniform timeouts and retry policy for all outbound tool calls ======
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "3.05"))
+HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "20"))
+HTTP_RETRIES = int(os.getenv("HTTP_RETRIES", "2"))
+HTTP_BACKOFF = float(os.getenv("HTTP_BACKOFF", "0.3"))          # seconds, doubled per attempt
+HTTP_BACKOFF_JITTER = float(os.getenv("HTTP_BACKOFF_JITTER", "0.2"))
+HTTP_BACKOFF_MAX = 2.0
+# backoff_jitter/backoff_max are Retry arguments only from urllib3 2.x; 1.26 (still pinned by
+# some environments) gets the same cap through its class attribute and no jitter
+URLLIB3_V2 = int(urllib3.__version__.split(".")[0]) >= 2
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+DEFAULT_TIMEOUT = (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT)
+_ASYNC_TIMEOUT = httpx.Timeout(HTTP_READ_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT)
+
+
+def tool_timeout(tool_name: str) -> tuple:
+    """
+    (connect, read) timeout for a tool's requests: reads end at the tool's
+    deadline, or sooner when the running job has less time left.
+    """
+    read = time_left(TOOL_TIMEOUTS.get(tool_name, HTTP_READ_TIMEOUT))
+    return (min(HTTP_CONNECT_TIMEOUT, read), read)
+
+# ====== Shared sync session (keep-alive pool per host) ======
+_session = None
+_SESSION_LOCK = threading.Lock()
+
+
+class _CappedRetry(Retry):
+    """urllib3 1.26: caps the backoff at HTTP_BACKOFF_MAX instead of the 120 s default."""
+
+    def get_backoff_time(self) -> float:
+        return min(HTTP_BACKOFF_MAX, super().get_backoff_time())
+
+
+def _retry() -> Retry:
+    # Tool POSTs (Tavily search, soil GraphQL query, weather bulk) are reads, so they are retried too.
+    # Only failures that come back fast are retried (connect errors, retry statuses): a read
+    # timeout already spent the tool's whole deadline, and retrying it would hold the worker
+    # long after the graph gave up.
+    if URLLIB3_V2:
+        retry_cls, backoff = Retry, {"backoff_jitter": HTTP_BACKOFF_JITTER, "backoff_max": HTTP_BACKOFF_MAX}
+    else:
+        retry_cls, backoff = _CappedRetry, {}
+    return retry_cls(
+        total=HTTP_RETRIES,
+        read=0,
+        backoff_factor=HTTP_BACKOFF,
+        **backoff,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset({"GET", "POST"}),
+        respect_retry_after_header=False,  # a long Retry-After would outlive the tool deadline
+        raise_on_status=False,
+    )
+
+
+def get_session() -> requests.Session:
+    global _session
+    if _session is None:
+        with _SESSION_LOCK:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=16, pool_maxsize=32, max_retries=_retry())
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                _session = session
+    return _session
+
+
+def http_request(method: str, url: str, timeout=None, **kwargs) -> requests.Response:
+    """Pooled request with the shared retry policy and default (connect, read) timeouts."""
+    return get_session().request(method, url, timeout=timeout or DEFAULT_TIMEOUT, **kwargs)
+
+
+def http_get(url: str, **kwargs) -> requests.Response:
+    return http_request("GET", url, **kwargs)
+
+
+def http_post(url: str, **kwargs) -> requests.Response:
+    return http_request("POST", url, **kwargs)
+
+
+# ====== Shared async HTTP client (one per event loop) ======
+_ASYNC_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=60)
+_ASYNC_CLIENTS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+_LOCK = threading.Lock()
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """
+    Returns the pooled AsyncClient for the running event loop. httpx connections
+    are bound to the loop that opened them, so each loop gets its own client.
+    """
+    loop = asyncio.get_running_loop()
+    client = _ASYNC_CLIENTS.get(loop)
+    if client is None or client.is_closed:
+        with _LOCK:
+            client = _ASYNC_CLIENTS.get(loop)
+            if client is None or client.is_closed:
+                client = httpx.AsyncClient(limits=_ASYNC_LIMITS, timeout=_ASYNC_TIMEOUT, follow_redirects=True)
+                _ASYNC_CLIENTS[loop] = client
+    return client
+
+
+async def aclose_async_client() -> None:
+    loop = asyncio.get_running_loop()
+    client = _ASYNC_CLIENTS.pop(loop, None)
+    if client is not None:
+        await client.aclose()
+
+
+def _backoff(attempt: int) -> float:
+    return min(HTTP_BACKOFF_MAX, HTTP_BACKOFF * (2 ** attempt)) + random.uniform(0, HTTP_BACKOFF_JITTER)
+
+
+async def ahttp_request(method: str, url: str, timeout=None, **kwargs) -> httpx.Response:
+    """Async counterpart of http_request: same timeouts, retry statuses and jittered backoff."""
+    client = get_async_client()
+    if isinstance(timeout, tuple):
+        timeout = httpx.Timeout(timeout[1], connect=timeout[0])
+    for attempt in range(HTTP_RETRIES + 1):
+        try:
+            resp = await client.request(method, url, timeout=timeout or _ASYNC_TIMEOUT, **kwargs)
+            if resp.status_code not in RETRY_STATUSES or attempt == HTTP_RETRIES:
+                return resp
+        except (httpx.ConnectError, httpx.ConnectTimeout):  # never read timeouts, as in _retry()
+            if attempt == HTTP_RETRIES:
+                raise
+        await asyncio.sleep(_backoff(attempt))
+
+
+async def ahttp_get(url: str, **kwargs) -> httpx.Response:
+    return await ahttp_request("GET", url, **kwargs)
+
+
+async def ahttp_post(url: str, **kwargs) -> httpx.Response:
+    return await ahttp_request("POST", url, **kwargs)
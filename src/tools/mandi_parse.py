@@ -0,0 +1,82 @@
+import os
+from typing import Iterator, List, Optional
+
+from bs4 import BeautifulSoup
+try:
+    from selectolax.lexbor import LexborHTMLParser as HTMLParser
+    SELECTOLAX_AVAILABLE = True
+except Exception:
+    try:
+        from selectolax.parser import HTMLParser  # selectolax < 1.0
+        SELECTOLAX_AVAILABLE = True
+    except Exception:
+        SELECTOLAX_AVAILABLE = False
+try:
+    from lxml import etree
+    LXML_AVAILABLE = True
+except Exception:
+    LXML_AVAILABLE = False
+
+# "auto" picks the fastest installed backend: selectolax > lxml > bs4
+MANDI_PARSER = os.getenv("MANDI_PARSER", "auto")
+MIN_PRICE_COLS = 9
+_FEED_CHUNK = 64 * 1024
+
+
+def _rows_bs4(html: str) -> Iterator[List[str]]:
+    soup = BeautifulSoup(html, "html.parser")
+    for row in soup.select("tr")[1:]:  # skip header
+        yield [td.get_text(strip=True) for td in row.find_all("td")]
+
+
+def _rows_selectolax(html: str) -> Iterator[List[str]]:
+    tree = HTMLParser(html)
+    for row in tree.css("tr")[1:]:
+        yield [td.text(deep=True, separator="", strip=True) for td in row.css("td")]
+
+
+def _rows_lxml(html: str) -> Iterator[List[str]]:
+    """
+    Streams the page through lxml's pull parser so only <tr> end events are
+    materialized; each row is cleared once read. Every table is scanned,
+    like the bs4 backend (some pages split prices across several tables).
+    """
+    parser = etree.HTMLPullParser(events=("end",), tag="tr")
+    seen_header = False
+    for start in range(0, len(html), _FEED_CHUNK):
+        parser.feed(html[start:start + _FEED_CHUNK])
+        for _, el in parser.read_events():
+            if not seen_header:
+                seen_header = True
+            else:
+                yield ["".join(t.strip() for t in td.itertext()) for td in el.iter("td")]
+            el.clear()
+    parser.close()
+
+
+def _backend(name: str) -> str:
+    if name == "auto":
+        if SELECTOLAX_AVAILABLE:
+            return "selectolax"
+        if LXML_AVAILABLE:
+            return "lxml"
+        return "bs4"
+    if name == "selectolax" and not SELECTOLAX_AVAILABLE:
+        return "bs4"
+    if name == "lxml" and not LXML_AVAILABLE:
+        return "bs4"
+    return name
+
+
+def iter_table_rows(html: str, backend: Optional[str] = None) -> Iterator[List[str]]:
+    """
+    Yields the <td> texts of every row after the first (header) <tr>.
+    All backends return the same price rows as the original BeautifulSoup
+    parser, across every table on the page.
+    """
+    name = _backend(backend or MANDI_PARSER)
+    if name == "selectolax":
+        return _rows_selectolax(html)
+    if name == "lxml":
+        return _rows_lxml(html)
+    return _rows_bs4(html)
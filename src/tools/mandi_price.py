@@ -1,6 +1,109 @@
-import requests
-from bs4 import BeautifulSoup
-from typing import Any, Dict
+import os
+import time
+import asyncio
+from typing import Any, Dict, List, Tuple
+from .cache import TTLCache, SingleFlight, AsyncSingleFlight
+from .http_client import http_get, ahttp_get, tool_timeout
+from .mandi_parse import iter_table_rows, MIN_PRICE_COLS
+
+MANDI_BASE_URL = "https://www.commodityonline.com/mandiprices/state"
+MANDI_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/115.0.0.0 Safari/537.36"
+    ),
+    "Accept-Language": "en-IN,en;q=0.9"
+}
+
+# Parsed state tables: normalized state -> {normalized commodity: [rows]}
+MANDI_CACHE_TTL = float(os.getenv("MANDI_CACHE_TTL", "1800"))
+# A page with no price rows is usually a failed or blocked scrape: retried soon instead
+MANDI_EMPTY_TTL = float(os.getenv("MANDI_EMPTY_TTL", "60"))
+_STATE_TABLES = TTLCache(maxsize=64, ttl=MANDI_CACHE_TTL)
+_FETCHES = SingleFlight()
+_ASYNC_FETCHES = AsyncSingleFlight()
+
+
+def _norm(name: str) -> str:
+    return " ".join(str(name or "").lower().split())
+
+
+def _parse_query(query: Any) -> Tuple[str, str]:
+    state_name, commodity = [p.strip() for p in str(query).split(",", 1)]
+    return state_name, commodity
+
+
+def _state_url(state_name: str) -> str:
+    return f"{MANDI_BASE_URL}/{state_name.lower().replace(' ', '-')}"
+
+
+def _index_rows(html: str) -> Dict[str, List[Dict[str, str]]]:
+    """Parses every price row of a state page, grouped by normalized commodity."""
+    table: Dict[str, List[Dict[str, str]]] = {}
+    for cols in iter_table_rows(html):
+        if not cols or len(cols) < MIN_PRICE_COLS:
+            continue
+        rec = {
+            "Commodity": cols[0],
+            "Arrival Date": cols[1],
+            "Variety": cols[2],
+            "State": cols[3],
+            "District": cols[4],
+            "Market": cols[5],
+            "Min Price": cols[6],
+            "Max Price": cols[7],
+            "Avg Price": cols[8]
+        }
+        table.setdefault(_norm(rec["Commodity"]), []).append(rec)
+    return table
+
+
+def _remember(state_name: str, table: Dict[str, List[Dict[str, str]]]) -> Dict[str, Any]:
+    entry = {"commodities": table, "fetched_at": time.time()}
+    _STATE_TABLES.set(_norm(state_name), entry, ttl=None if table else MANDI_EMPTY_TTL)
+    return entry
+
+
+def _fetch_state_table(state_name: str) -> Dict[str, Any]:
+    resp = http_get(_state_url(state_name), headers=MANDI_HEADERS, timeout=tool_timeout("mandi_price"))
+    resp.raise_for_status()
+    return _remember(state_name, _index_rows(resp.text))
+
+
+async def _fetch_state_table_async(state_name: str) -> Dict[str, Any]:
+    resp = await ahttp_get(_state_url(state_name), headers=MANDI_HEADERS, timeout=tool_timeout("mandi_price"))
+    resp.raise_for_status()
+    # Parsing is CPU-bound; keep it off the event loop
+    return _remember(state_name, await asyncio.to_thread(_index_rows, resp.text))
+
+
+def get_state_table(state_name: str) -> Dict[str, Any]:
+    """
+    Cached {"commodities": {commodity: [rows]}, "fetched_at"} for a state;
+    concurrent misses for one state share a single fetch.
+    """
+    key = _norm(state_name)
+    table = _STATE_TABLES.get(key)
+    if table is None:
+        table = _FETCHES.do(key, _fetch_state_table, state_name)
+    return table
+
+
+async def get_state_table_async(state_name: str) -> Dict[str, Any]:
+    key = _norm(state_name)
+    table = _STATE_TABLES.get(key)
+    if table is None:
+        table = await _ASYNC_FETCHES.do(key, _fetch_state_table_async, state_name)
+    return table
+
+
+def _tool_result(table: Dict[str, Any], state_name: str, commodity: str) -> Dict[str, Any]:
+    results = list(table["commodities"].get(_norm(commodity), []))
+    if not results:
+        raise ValueError(f"No data found for commodity '{commodity}' in state '{state_name}'.")
+    return {"results": results, "state": state_name, "commodity": commodity, "fetched_at": table["fetched_at"]}
+
 
 def mandi_price_tool_node(state: Dict[str, Any]) -> Dict[str, Any]:
     """
@@ -11,47 +114,23 @@ def mandi_price_tool_node(state: Dict[str, Any]) -> Dict[str, Any]:
         return {**state, "tool_result": {"error": "tool_query must be 'state,commodity'"}}
 
     try:
-        state_name, commodity = [p.strip() for p in str(query).split(",", 1)]
-
-        base_url = "https://www.commodityonline.com/mandiprices/state"
-        url = f"{base_url}/{state_name.lower().replace(' ', '-')}"
-        headers = {
-            "User-Agent": (
-                "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                "AppleWebKit/537.36 (KHTML, like Gecko) "
-                "Chrome/115.0.0.0 Safari/537.36"
-            ),
-            "Accept-Language": "en-IN,en;q=0.9"
-        }
+        state_name, commodity = _parse_query(query)
+        tool_result = _tool_result(get_state_table(state_name), state_name, commodity)
 
-        resp = requests.get(url, headers=headers, timeout=20)
-        resp.raise_for_status()
-        soup = BeautifulSoup(resp.text, "html.parser")
-
-        rows = soup.select("tr")[1:]  # skip header
-        results = []
-        for row in rows:
-            cols = [td.get_text(strip=True) for td in row.find_all("td")]
-            if not cols or len(cols) < 9:
-                continue
-            rec = {
-                "Commodity": cols[0],
-                "Arrival Date": cols[1],
-                "Variety": cols[2],
-                "State": cols[3],
-                "District": cols[4],
-                "Market": cols[5],
-                "Min Price": cols[6],
-                "Max Price": cols[7],
-                "Avg Price": cols[8]
-            }
-            if rec["Commodity"].lower() == commodity.lower():
-                results.append(rec)
-
-        if not results:
-            raise ValueError(f"No data found for commodity '{commodity}' in state '{state_name}'.")
-
-        tool_result = {"results": results, "state": state_name, "commodity": commodity}
+    except Exception as e:
+        tool_result = {"error": str(e)}
+
+    return {**state, "tool_result": tool_result}
+
+
+async def mandi_price_tool_node_async(state: Dict[str, Any]) -> Dict[str, Any]:
+    query = state.get("tool_query", "")
+    if not query or "," not in str(query):
+        return {**state, "tool_result": {"error": "tool_query must be 'state,commodity'"}}
+
+    try:
+        state_name, commodity = _parse_query(query)
+        tool_result = _tool_result(await get_state_table_async(state_name), state_name, commodity)
 
     except Exception as e:
         tool_result = {"error": str(e)}
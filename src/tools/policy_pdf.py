@@ -1,15 +1,122 @@
-from typing import Any, Dict
-from .vector_db import get_policy_vector_db
+import os
+import re
+import asyncio
+from typing import Any, Dict, List, Optional
+from .bm25 import get_lexical_index
+from .cache import TTLCache
+from .config import POLICY_SEARCH_MODE, POLICY_LEXICAL_CANDIDATES
+from .embeddings import get_embeddings
+from .vector_db import get_policy_vector_db, index_generation
+
+POLICY_TOP_K = 5
+RRF_K = 60  # reciprocal rank fusion constant
+# Queries up to this many terms whose best BM25 hit contains all of them
+# ("eNAM registration", "AIF") are answered lexically without embedding
+KEYWORD_QUERY_MAX_TERMS = 3
+# Scheme questions repeat a lot ("PM-KISAN eligibility"); keep their embeddings and hits
+POLICY_CACHE_SIZE = int(os.getenv("POLICY_CACHE_SIZE", "512"))
+
+_QUERY_EMBEDDINGS = TTLCache(maxsize=POLICY_CACHE_SIZE)
+_RESULTS = TTLCache(maxsize=POLICY_CACHE_SIZE)
+_results_generation = None
+
+
+def _normalize_query(q: str) -> str:
+    # The embedding model is uncased, so case and spacing never change the vector
+    return re.sub(r"\s+", " ", str(q)).strip().lower().rstrip("?.!")
+
+
+def _query_embedding(norm: str) -> List[float]:
+    vector = _QUERY_EMBEDDINGS.get(norm)
+    if vector is None:
+        vector = get_embeddings().embed_query(norm)
+        _QUERY_EMBEDDINGS.set(norm, vector)
+    return vector
+
+
+def _dense_search(db, norm: str, k: int) -> List[Dict[str, Any]]:
+    results = db.similarity_search_by_vector(_query_embedding(norm), k=k)
+    return [{"content": r.page_content, "metadata": r.metadata} for r in results]
+
+
+def _lexical_search(norm: str, k: int) -> List[Dict[str, Any]]:
+    index = get_lexical_index()
+    return [{"content": index.texts[doc], "metadata": index.metadatas[doc]} for doc, _ in index.search(norm, k)]
+
+
+def _rrf_merge(rankings: List[List[Dict[str, Any]]], k: int) -> List[Dict[str, Any]]:
+    scores: Dict[tuple, float] = {}
+    docs: Dict[tuple, Dict[str, Any]] = {}
+    for ranking in rankings:
+        for rank, doc in enumerate(ranking):
+            meta = doc["metadata"] or {}
+            key = (meta.get("source"), meta.get("page"), meta.get("start_index"), doc["content"][:64])
+            scores[key] = scores.get(key, 0.0) + 1.0 / (RRF_K + rank + 1)
+            docs.setdefault(key, doc)
+    return [docs[key] for key in sorted(scores, key=lambda x: -scores[x])[:k]]
+
+
+def _hybrid_search(db, norm: str, k: int) -> List[Dict[str, Any]]:
+    index = get_lexical_index()
+    hits = index.search(norm, max(k, POLICY_LEXICAL_CANDIDATES))
+    lexical = [{"content": index.texts[doc], "metadata": index.metadatas[doc]} for doc, _ in hits]
+    if hits and len(norm.split()) <= KEYWORD_QUERY_MAX_TERMS and index.covers(norm, hits[0][0]):
+        return lexical[:k]
+    return _rrf_merge([_dense_search(db, norm, max(k, POLICY_LEXICAL_CANDIDATES)), lexical], k)
+
+
+def search_policy(q: str, k: int = POLICY_TOP_K, mode: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Top-k policy chunks for a query; cached until the index changes.
+    mode: "dense" (Chroma), "lexical" (BM25) or "hybrid" (default): keyword
+    queries fully matched by BM25 skip the dense search, others merge both
+    rankings by reciprocal rank.
+    """
+    global _results_generation
+    mode = mode or POLICY_SEARCH_MODE
+    db = get_policy_vector_db()  # loads and syncs the index on first use
+    generation = index_generation()
+    if generation != _results_generation:
+        _RESULTS.clear()
+        _results_generation = generation
+
+    norm = _normalize_query(q)
+    key = (norm, k, mode)
+    cached = _RESULTS.get(key)
+    if cached is not None:
+        return list(cached)
+
+    if mode == "lexical":
+        result_list = _lexical_search(norm, k)
+    elif mode == "hybrid":
+        result_list = _hybrid_search(db, norm, k)
+    else:
+        result_list = _dense_search(db, norm, k)
+    _RESULTS.set(key, result_list)
+    return list(result_list)
+
+
+def warm_up() -> None:
+    """Loads the embedding model and syncs the vector (and lexical) index."""
+    get_policy_vector_db()
+    if POLICY_SEARCH_MODE != "dense":
+        get_lexical_index()
+
+
+def policy_cache_stats() -> Dict[str, Any]:
+    return {"embeddings": _QUERY_EMBEDDINGS.stats(), "results": _RESULTS.stats(), "generation": _results_generation}
+
 
 def policy_pdf_tool_node(state: Dict[str, Any]) -> Dict[str, Any]:
     q = state.get("tool_query", "")
     if not q:
         return {**state, "tool_result": {"error": "Empty query"}}
     try:
-        policy_db = get_policy_vector_db()
-        results = policy_db.similarity_search(str(q), k=5)
-        result_list = [{"content": r.page_content, "metadata": r.metadata} for r in results]
-        tool_result = {"results": result_list}
+        tool_result = {"results": search_policy(q)}
     except Exception as e:
         tool_result = {"error": str(e)}
     return {**state, "tool_result": tool_result}
+
+async def policy_pdf_tool_node_async(state: Dict[str, Any]) -> Dict[str, Any]:
+    # Embedding + ANN search is local CPU work; run it on a worker thread
+    return await asyncio.to_thread(policy_pdf_tool_node, state)
@@ -0,0 +1,83 @@
+import importlib
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+# tool name -> (module in src.tools, sync node, async node); modules are imported on first lookup
+TOOL_SPECS = {
+    "web_search": ("web_search", "web_search_tool_node", "web_search_tool_node_async"),
+    "weather": ("weather", "weather_tool_node", "weather_tool_node_async"),
+    "policy_pdf": ("policy_pdf", "policy_pdf_tool_node", "policy_pdf_tool_node_async"),
+    "mandi_price": ("mandi_price", "mandi_price_tool_node", "mandi_price_tool_node_async"),
+    "soil_nutrient": ("soil_nutrient", "soil_nutrient_tool_node", "soil_nutrient_tool_node_async"),
+}
+
+# Tools that answer several queries in one upstream call: queries list -> outputs list
+BATCH_SPECS = {
+    "weather": ("weather", "get_weather_many", "get_weather_many_async"),
+}
+
+_TOOLS: Dict[tuple, Callable] = {}
+_LOCK = threading.Lock()
+_WARMUP_LOCK = threading.Lock()
+_WARMUP_THREAD = None
+
+
+def tool_names() -> List[str]:
+    return list(TOOL_SPECS)
+
+
+def _module(name: str):
+    return importlib.import_module(f"{__package__}.{TOOL_SPECS[name][0]}")
+
+
+def get_tool(name: str, use_async: bool = False) -> Optional[Callable[[Dict[str, Any]], Any]]:
+    """Tool node by name (coroutine function when use_async), or None for unknown tools."""
+    key = (name, use_async)
+    fn = _TOOLS.get(key)
+    if fn is None and name in TOOL_SPECS:
+        with _LOCK:
+            fn = _TOOLS.get(key)
+            if fn is None:
+                fn = getattr(_module(name), TOOL_SPECS[name][2 if use_async else 1])
+                _TOOLS[key] = fn
+    return fn
+
+
+def get_batch_tool(name: str, use_async: bool = False) -> Optional[Callable[[List[Any]], Any]]:
+    """Batch lookup for a tool, or None when the tool has no batch form."""
+    key = (name, use_async, "batch")
+    fn = _TOOLS.get(key)
+    if fn is None and name in BATCH_SPECS:
+        with _LOCK:
+            fn = _TOOLS.get(key)
+            if fn is None:
+                module, sync_name, async_name = BATCH_SPECS[name]
+                fn = getattr(importlib.import_module(f"{__package__}.{module}"), async_name if use_async else sync_name)
+                _TOOLS[key] = fn
+    return fn
+
+
+def _warm_up(names: Iterable[str]) -> None:
+    for name in names:
+        try:
+            hook = getattr(_module(name), "warm_up", None)
+            if hook:
+                hook()
+        except Exception as e:
+            print(f"⚠️ warm-up of {name} failed: {e}")
+
+
+def warm_up(names: Optional[Iterable[str]] = None, background: bool = True) -> None:
+    """
+    Imports tools and builds their heavy resources (embedding model, policy
+    index) ahead of the first query; safe to call on every Streamlit rerun.
+    """
+    global _WARMUP_THREAD
+    names = list(names or TOOL_SPECS)
+    if not background:
+        _warm_up(names)
+        return
+    with _WARMUP_LOCK:
+        if _WARMUP_THREAD is None:
+            _WARMUP_THREAD = threading.Thread(target=_warm_up, args=(names,), name="tools-warmup", daemon=True)
+            _WARMUP_THREAD.start()
@@ -0,0 +1,160 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import Any, Callable, Dict, Optional
+
+# ====== Persistent tool result cache (shared by sessions, processes and replicas on one host) ======
+TOOL_CACHE_BACKEND = os.getenv("TOOL_CACHE_BACKEND", "sqlite")  # "sqlite" or "none"
+TOOL_CACHE_PATH = os.getenv("TOOL_CACHE_PATH", os.path.join(".cache", "tool_results.sqlite"))
+TOOL_CACHE_MAX_MB = float(os.getenv("TOOL_CACHE_MAX_MB", "64"))
+EVICT_EVERY = 64  # writes between size checks
+
+# Seconds a successful result stays valid, counted from its "fetched_at" (when the
+# tool actually called upstream; tools serving from their own memory cache keep
+# the original stamp), else from the write. 0 disables persistence for that tool.
+# policy_pdf is local and already cached in memory per index generation.
+TOOL_CACHE_TTLS = {
+    name: float(os.getenv(f"TOOL_CACHE_TTL_{name.upper()}", default))
+    for name, default in {
+        "weather": "600", "mandi_price": "1800", "soil_nutrient": str(6 * 3600), "web_search": "900", "policy_pdf": "0",
+    }.items()
+}
+
+
+def _key(tool: str, query: Any) -> str:
+    if isinstance(query, str):
+        query = " ".join(query.split()).lower()
+    raw = json.dumps([tool, query], sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class NullResultCache:
+    """Backend that stores nothing (TOOL_CACHE_BACKEND=none)."""
+
+    def get(self, tool: str, query: Any) -> Optional[Dict[str, Any]]:
+        return None
+
+    def set(self, tool: str, query: Any, value: Dict[str, Any]) -> None:
+        pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {}
+
+
+class SQLiteResultCache:
+    """
+    JSON tool outputs in a WAL-mode SQLite file: readers never block the
+    writer, and any number of processes can share the file. Expired rows
+    are dropped, then the soonest-to-expire rows go until the file's
+    payload fits max_bytes.
+    """
+
+    def __init__(self, path: str, max_bytes: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._writes = 0
+        self._local = threading.local()  # sqlite3 connections are per thread
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn().execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            "key TEXT PRIMARY KEY, tool TEXT, value TEXT, size INTEGER, expires_at REAL)"
+        )
+        self._conn().execute("CREATE INDEX IF NOT EXISTS results_expires ON results (expires_at)")
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, tool: str, query: Any) -> Optional[Dict[str, Any]]:
+        if TOOL_CACHE_TTLS.get(tool, 0) <= 0:
+            return None
+        try:
+            row = self._conn().execute(
+                "SELECT value FROM results WHERE key = ? AND expires_at > ?", (_key(tool, query), time.time())
+            ).fetchone()
+        except sqlite3.Error:
+            row = None
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(row[0])
+
+    def set(self, tool: str, query: Any, value: Dict[str, Any]) -> None:
+        ttl = TOOL_CACHE_TTLS.get(tool, 0)
+        if ttl <= 0:
+            return
+        expires_at = (value.get("fetched_at") or time.time()) + ttl
+        if expires_at <= time.time():
+            return  # already older than the limit (e.g. served stale by the tool)
+        payload = json.dumps(value, ensure_ascii=False, default=str)
+        try:
+            self._conn().execute(
+                "INSERT OR REPLACE INTO results (key, tool, value, size, expires_at) VALUES (?, ?, ?, ?, ?)",
+                (_key(tool, query), tool, payload, len(payload), expires_at),
+            )
+            self._writes += 1
+            if self._writes % EVICT_EVERY == 0:
+                self.evict()
+        except sqlite3.Error:
+            pass  # a busy or read-only cache must never fail the tool call
+
+    def evict(self) -> None:
+        conn = self._conn()
+        conn.execute("DELETE FROM results WHERE expires_at <= ?", (time.time(),))
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        excess = total - self.max_bytes
+        doomed = []
+        for key, size in conn.execute("SELECT key, size FROM results ORDER BY expires_at"):
+            doomed.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+        conn.executemany("DELETE FROM results WHERE key = ?", doomed)
+
+    def stats(self) -> Dict[str, Any]:
+        rows, size = self._conn().execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results").fetchone()
+        return {"hits": self.hits, "misses": self.misses, "rows": rows, "bytes": size}
+
+
+BACKENDS: Dict[str, Callable[[], Any]] = {
+    "sqlite": lambda: SQLiteResultCache(TOOL_CACHE_PATH, int(TOOL_CACHE_MAX_MB * 1024 * 1024)),
+    "none": NullResultCache,
+}
+
+_cache = None
+_LOCK = threading.Lock()
+
+
+def get_result_cache():
+    """Process-wide result cache for the configured backend (falls back to none if it cannot open)."""
+    global _cache
+    if _cache is None:
+        with _LOCK:
+            if _cache is None:
+                try:
+                    _cache = BACKENDS[TOOL_CACHE_BACKEND]()
+                except Exception as e:
+                    print(f"⚠️ tool result cache disabled: {e}")
+                    _cache = NullResultCache()
+    return _cache
+
+
+def set_result_cache(cache) -> None:
+    """Installs another backend (any object with get/set/stats)."""
+    global _cache
+    with _LOCK:
+        _cache = cache
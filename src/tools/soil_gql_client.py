@@ -1,5 +1,5 @@
-import requests
-from typing import Any, Dict
+from typing import Any, Dict, List
+from .http_client import http_post, ahttp_post, tool_timeout
 
 GQL_URL = "https://soilhealth4.dac.gov.in/"
 HEADERS = {
@@ -26,25 +26,59 @@ query GetNutrientDashboardForPortal(
 }
 """
 
-def gql_post(query: str, variables: Dict[str, Any]):
-    payload = {
+def _gql_payload(query: str, variables: Dict[str, Any]) -> Dict[str, Any]:
+    return {
         "operationName": "GetNutrientDashboardForPortal",
         "variables": variables,
         "query": query,
     }
-    r = requests.post(GQL_URL, json=payload, headers=HEADERS, timeout=30)
-    r.raise_for_status()
-    j = r.json()
+
+def _gql_data(j: Dict[str, Any]):
     if "errors" in j:
         raise RuntimeError(j["errors"])
     return j["data"]["getNutrientDashboardForPortal"]
 
+def gql_post(query: str, variables: Dict[str, Any]):
+    r = http_post(GQL_URL, json=_gql_payload(query, variables), headers=HEADERS, timeout=tool_timeout("soil_nutrient"))
+    r.raise_for_status()
+    return _gql_data(r.json())
+
+async def gql_post_async(query: str, variables: Dict[str, Any]):
+    r = await ahttp_post(GQL_URL, json=_gql_payload(query, variables), headers=HEADERS, timeout=tool_timeout("soil_nutrient"))
+    r.raise_for_status()
+    return _gql_data(r.json())
+
 def fetch_all_states(cycle: str = "2025-26"):
     return gql_post(GQL_QUERY, {"cycle": cycle})
 
+async def fetch_all_states_async(cycle: str = "2025-26"):
+    return await gql_post_async(GQL_QUERY, {"cycle": cycle})
+
 def filter_by_state(all_data, state_name: str):
     state_name = (state_name or "").lower()
     return [
         row for row in all_data
         if str(row.get("state", {}).get("name", "")).strip().lower() == state_name
     ]
+
+def normalize_place(name: Any) -> str:
+    return " ".join(str(name or "").lower().replace("&", "and").split())
+
+def index_by_state_district(all_data) -> Dict[str, Dict[str, Any]]:
+    """
+    One pass over the national dataset:
+      {state_key: {"rows": [...], "districts": {district_key: [...]}}}
+    Rows without a district are kept at state level only.
+    """
+    index: Dict[str, Dict[str, Any]] = {}
+    for row in all_data or []:
+        state_key = normalize_place((row.get("state") or {}).get("name"))
+        if not state_key:
+            continue
+        entry = index.setdefault(state_key, {"rows": [], "districts": {}})
+        entry["rows"].append(row)
+        district_key = normalize_place((row.get("district") or {}).get("name"))
+        if district_key:
+            districts: Dict[str, List[Any]] = entry["districts"]
+            districts.setdefault(district_key, []).append(row)
+    return index
@@ -1,9 +1,121 @@
+import os
 import json
-from typing import Any, Dict
-from .soil_gql_client import fetch_all_states, filter_by_state
+import time
+import threading
+from typing import Any, Dict, Optional, Tuple
+from .cache import SingleFlight, AsyncSingleFlight
+from .soil_gql_client import fetch_all_states, fetch_all_states_async, index_by_state_district, normalize_place
+
+# Indexed full-country dataset per cycle; cycles are cached side by side.
+# Fresh for SOIL_CACHE_TTL; after that it is still served (up to SOIL_STALE_TTL)
+# while one background refresh fetches the new copy.
+SOIL_CACHE_TTL = float(os.getenv("SOIL_CACHE_TTL", str(6 * 3600)))
+SOIL_STALE_TTL = float(os.getenv("SOIL_STALE_TTL", str(7 * 24 * 3600)))
+SOIL_REFRESH_RETRY = 60.0  # seconds before retrying a failed background refresh
+_CYCLE_INDEX: Dict[str, Dict[str, Any]] = {}  # cycle -> {"index": {...}, "fetched_at": float}
+_LOCK = threading.Lock()
+_REFRESHING = set()
+_RETRY_AT: Dict[str, float] = {}
+_FETCHES = SingleFlight()
+_ASYNC_FETCHES = AsyncSingleFlight()
+
+
+def _parse_query(q: Any) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    """Returns (query_dict, error)."""
+    if q is None:
+        return None, "Empty query"
+    if isinstance(q, str):
+        try:
+            q = json.loads(q)
+        except Exception:
+            return None, "Invalid query format"
+    if not q.get("state_name"):
+        return None, "Missing 'state_name' in query"
+    return q, None
+
+
+def _store_index(cycle: str, all_data) -> Dict[str, Any]:
+    entry = {"index": index_by_state_district(all_data), "fetched_at": time.time()}
+    with _LOCK:
+        _CYCLE_INDEX[cycle] = entry
+        _RETRY_AT.pop(cycle, None)
+    return entry
+
+
+def _load(cycle: str) -> Dict[str, Any]:
+    return _store_index(cycle, fetch_all_states(cycle))
+
+
+async def _load_async(cycle: str) -> Dict[str, Any]:
+    return _store_index(cycle, await fetch_all_states_async(cycle))
+
+
+def _refresh(cycle: str) -> None:
+    try:
+        _FETCHES.do(cycle, _load, cycle)
+    except Exception as e:
+        print(f"⚠️ soil refresh for {cycle} failed: {e}")
+        with _LOCK:
+            _RETRY_AT[cycle] = time.time() + SOIL_REFRESH_RETRY
+    finally:
+        with _LOCK:
+            _REFRESHING.discard(cycle)
+
+
+def _cached_index(cycle: str):
+    """Fresh or stale-but-usable entry (starting a background refresh if stale), else None."""
+    now = time.time()
+    with _LOCK:
+        entry = _CYCLE_INDEX.get(cycle)
+        if not entry or now - entry["fetched_at"] >= SOIL_STALE_TTL:
+            return None
+        if now - entry["fetched_at"] < SOIL_CACHE_TTL:
+            return entry
+        start = cycle not in _REFRESHING and _RETRY_AT.get(cycle, 0) <= now
+        if start:
+            _REFRESHING.add(cycle)
+    if start:
+        threading.Thread(target=_refresh, args=(cycle,), name=f"soil-refresh-{cycle}", daemon=True).start()
+    return entry
+
+
+def get_cycle_index(cycle: str) -> Dict[str, Any]:
+    """
+    Cached {"index", "fetched_at"} for a cycle; on a cold cache concurrent
+    callers share one full-country download.
+    """
+    entry = _cached_index(cycle)
+    if entry is None:
+        entry = _FETCHES.do(cycle, _load, cycle)
+    return entry
+
+
+async def get_cycle_index_async(cycle: str) -> Dict[str, Any]:
+    entry = _cached_index(cycle)
+    if entry is None:
+        entry = await _ASYNC_FETCHES.do(cycle, _load_async, cycle)
+    return entry
+
+
+def warm_up() -> None:
+    """Downloads and indexes the default cycle ahead of the first soil question."""
+    get_cycle_index("2025-26")
+
+
+def _tool_result(cached: Dict[str, Any], cycle: str, state_name: str, district_name: Optional[str]) -> Dict[str, Any]:
+    entry = cached["index"].get(normalize_place(state_name))
+    if not entry:
+        return {"error": f"No data found for state '{state_name}'"}
+
+    # fetched_at: when the dataset was downloaded, so downstream caches expire from then
+    result = {"cycle": cycle, "state_name": state_name, "fetched_at": cached["fetched_at"]}
+    if district_name:
+        rows = entry["districts"].get(normalize_place(district_name))
+        if rows:
+            return {**result, "district_name": district_name, "results": rows}
+        result["note"] = f"No district-level data for '{district_name}'; returning state-level data."
+    return {**result, "results": entry["rows"]}
 
-# Cache for full-country fetch per cycle
-_ALL_DATA_CACHE = None  # {"cycle": str, "data": [...]}
 
 def soil_nutrient_tool_node(state: Dict[str, Any]) -> Dict[str, Any]:
     """
@@ -11,46 +123,35 @@ def soil_nutrient_tool_node(state: Dict[str, Any]) -> Dict[str, Any]:
       state["tool_query"] = {
         "cycle": "2025-26",   # optional
         "state_name": "Bihar",
-        "district_name": "Patna"   # optional (not filtered here, but you can extend)
+        "district_name": "Patna"   # optional
       }
     """
-    global _ALL_DATA_CACHE
+    q, err = _parse_query(state.get("tool_query"))
+    if err:
+        return {**state, "tool_result": {"error": err}}
 
-    q = state.get("tool_query")
-    if q is None:
-        return {**state, "tool_result": {"error": "Empty query"}}
+    cycle = q.get("cycle") or "2025-26"
 
-    if isinstance(q, str):
-        try:
-            q = json.loads(q)
-        except Exception:
-            return {**state, "tool_result": {"error": "Invalid query format"}}
+    try:
+        cached = get_cycle_index(cycle)
+
+        return {**state, "tool_result": _tool_result(cached, cycle, q["state_name"], q.get("district_name"))}
+
+    except Exception as e:
+        return {**state, "tool_result": {"error": str(e)}}
 
-    cycle = q.get("cycle", "2025-26")
-    state_name = q.get("state_name")
 
-    if not state_name:
-        return {**state, "tool_result": {"error": "Missing 'state_name' in query"}}
+async def soil_nutrient_tool_node_async(state: Dict[str, Any]) -> Dict[str, Any]:
+    q, err = _parse_query(state.get("tool_query"))
+    if err:
+        return {**state, "tool_result": {"error": err}}
+
+    cycle = q.get("cycle") or "2025-26"
 
     try:
-        if _ALL_DATA_CACHE is None or _ALL_DATA_CACHE.get("cycle") != cycle:
-            all_data = fetch_all_states(cycle)
-            _ALL_DATA_CACHE = {"cycle": cycle, "data": all_data}
-        else:
-            all_data = _ALL_DATA_CACHE["data"]
-
-        results = filter_by_state(all_data, state_name)
-        if not results:
-            return {**state, "tool_result": {"error": f"No data found for state '{state_name}'"}}
-
-        return {
-            **state,
-            "tool_result": {
-                "cycle": cycle,
-                "state_name": state_name,
-                "results": results
-            }
-        }
+        cached = await get_cycle_index_async(cycle)
+
+        return {**state, "tool_result": _tool_result(cached, cycle, q["state_name"], q.get("district_name"))}
 
     except Exception as e:
         return {**state, "tool_result": {"error": str(e)}}
@@ -1,12 +1,54 @@
 import os
-import requests
+import re
+import time
+from .cache import TTLCache, SingleFlight, AsyncSingleFlight
+from .http_client import http_post, ahttp_post, tool_timeout
 
-def tavily_search(query: str, max_results: int = 5):
+TAVILY_URL = "https://api.tavily.com/search"
+
+# News-style queries cluster in time; identical searches within the TTL reuse one call
+TAVILY_CACHE_TTL = float(os.getenv("TAVILY_CACHE_TTL", "900"))
+_SEARCHES = TTLCache(maxsize=512, ttl=TAVILY_CACHE_TTL)
+_FETCHES = SingleFlight()
+_ASYNC_FETCHES = AsyncSingleFlight()
+
+def _tavily_payload(query: str, max_results: int):
     api_key = os.getenv("TAVILY_API_KEY")
     if not api_key:
         raise RuntimeError("TAVILY_API_KEY not set.")
-    url = "https://api.tavily.com/search"
-    payload = {"api_key": api_key, "query": query, "max_results": max_results}
-    resp = requests.post(url, json=payload, timeout=30)
+    return {"api_key": api_key, "query": query, "max_results": max_results}
+
+def _cache_key(query: str, max_results: int):
+    return (re.sub(r"\s+", " ", str(query)).strip().lower(), max_results)
+
+def _fetch(query: str, max_results: int):
+    resp = http_post(TAVILY_URL, json=_tavily_payload(query, max_results), timeout=tool_timeout("web_search"))
     resp.raise_for_status()
-    return resp.json()
+    result = {**resp.json(), "fetched_at": time.time()}
+    _SEARCHES.set(_cache_key(query, max_results), result)
+    return result
+
+async def _fetch_async(query: str, max_results: int):
+    resp = await ahttp_post(TAVILY_URL, json=_tavily_payload(query, max_results), timeout=tool_timeout("web_search"))
+    resp.raise_for_status()
+    result = {**resp.json(), "fetched_at": time.time()}
+    _SEARCHES.set(_cache_key(query, max_results), result)
+    return result
+
+def tavily_search(query: str, max_results: int = 5):
+    """Cached search; concurrent identical searches share one upstream call."""
+    key = _cache_key(query, max_results)
+    result = _SEARCHES.get(key)
+    if result is None:
+        result = _FETCHES.do(key, _fetch, query, max_results)
+    return dict(result)
+
+async def tavily_search_async(query: str, max_results: int = 5):
+    key = _cache_key(query, max_results)
+    result = _SEARCHES.get(key)
+    if result is None:
+        result = await _ASYNC_FETCHES.do(key, _fetch_async, query, max_results)
+    return dict(result)
+
+def tavily_cache_stats():
+    return _SEARCHES.stats()
@@ -1,29 +1,186 @@
 import os
+import sys
+import json
+import hashlib
+import threading
+from typing import Any, Dict, List
+
+# Force Chroma to use a modern SQLite version from pysqlite3-binary
+try:
+    __import__("pysqlite3")
+    sys.modules["sqlite3"] = sys.modules.pop("pysqlite3")
+except ImportError:
+    pass
+
 from langchain_community.document_loaders import PyPDFLoader
 from langchain_community.vectorstores import Chroma
-from langchain_community.embeddings import HuggingFaceEmbeddings
-from .config import PDF_FOLDER, VECTOR_DB_DIR
+from .config import PDF_FOLDER, VECTOR_DB_DIR, POLICY_EMBED_BATCH
+from .chunking import chunk_documents, chunking_signature
+from .embeddings import get_embeddings, embedding_signature
+
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
 
 # Lazy singleton
 _policy_db = None
+_DB_LOCK = threading.Lock()  # first load (warm-up thread vs first query)
+_SYNC_LOCK = threading.Lock()
+_GENERATION = 0  # bumped whenever the index contents change; caches key on it
+_FINGERPRINT = ""  # content digest of the index; stamps derived indexes stored on disk
 
-def get_policy_vector_db():
-    global _policy_db
-    if _policy_db is not None:
-        return _policy_db
 
-    embeddings = HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2")
-    if os.path.exists(VECTOR_DB_DIR):
-        _policy_db = Chroma(persist_directory=VECTOR_DB_DIR, embedding_function=embeddings)
-        return _policy_db
+def _sha256_file(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _manifest_path() -> str:
+    return os.path.join(VECTOR_DB_DIR, MANIFEST_NAME)
+
 
-    docs = []
+def _load_manifest():
+    try:
+        with open(_manifest_path(), "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest.get("version") == MANIFEST_VERSION:
+            return manifest
+    except Exception:
+        pass
+    return None
+
+
+def _save_manifest(manifest: Dict[str, Any]) -> None:
+    os.makedirs(VECTOR_DB_DIR, exist_ok=True)
+    tmp = _manifest_path() + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp, _manifest_path())
+
+
+def _scan_pdfs() -> Dict[str, str]:
+    """file name -> sha256 for every PDF in PDF_FOLDER."""
+    found = {}
     if os.path.isdir(PDF_FOLDER):
-        for file in os.listdir(PDF_FOLDER):
+        for file in sorted(os.listdir(PDF_FOLDER)):
             if file.lower().endswith(".pdf"):
-                loader = PyPDFLoader(os.path.join(PDF_FOLDER, file))
-                docs.extend(loader.load())
+                found[file] = _sha256_file(os.path.join(PDF_FOLDER, file))
+    return found
+
+
+def _canonical_files(found: Dict[str, str]) -> Dict[str, str]:
+    """Keeps one file per content hash (shortest name wins), e.g. drops 'Guidelines_PMKSY (1).pdf'."""
+    by_hash: Dict[str, str] = {}
+    for file, sha in found.items():
+        current = by_hash.get(sha)
+        if current is None or (len(file), file) < (len(current), current):
+            by_hash[sha] = file
+    return {file: sha for sha, file in by_hash.items()}
+
+
+def _bootstrap_manifest(db, found: Dict[str, str]) -> Dict[str, Any]:
+    """Adopts an index built before manifests existed, without re-embedding it."""
+    files: Dict[str, Any] = {}
+    orphans: List[str] = []
+    got = db.get(include=["metadatas"])
+    by_source: Dict[str, List[str]] = {}
+    for doc_id, meta in zip(got.get("ids", []), got.get("metadatas", [])):
+        source = os.path.basename(str((meta or {}).get("source", "")))
+        by_source.setdefault(source, []).append(doc_id)
+    for source, ids in by_source.items():
+        if source in found:
+            files[source] = {"sha256": found[source], "ids": ids}
+        else:
+            orphans.extend(ids)
+    if orphans:
+        db.delete(ids=orphans)
+    return {"version": MANIFEST_VERSION, "files": files}
 
-    _policy_db = Chroma.from_documents(docs, embeddings, persist_directory=VECTOR_DB_DIR)
-    _policy_db.persist()
+
+def sync_policy_index(db) -> Dict[str, List[str]]:
+    """
+    Brings the Chroma collection in line with PDF_FOLDER using the manifest
+    of content hashes: chunks and embeds only new/changed PDFs, deletes
+    removed ones and skips byte-identical duplicates. A change in chunking
+    settings or embedding model/backend re-embeds every file.
+    """
+    global _GENERATION, _FINGERPRINT
+    with _SYNC_LOCK:
+        found = _scan_pdfs()
+        manifest = _load_manifest() or _bootstrap_manifest(db, found)
+        files: Dict[str, Any] = manifest["files"]
+        wanted = _canonical_files(found)
+        rechunk = (manifest.get("chunking") != chunking_signature()
+                   or manifest.get("embeddings") != embedding_signature())
+        manifest["chunking"] = chunking_signature()
+        manifest["embeddings"] = embedding_signature()
+        summary = {"added": [], "updated": [], "removed": [], "duplicates": sorted(set(found) - set(wanted))}
+
+        for file in list(files):
+            if file not in wanted:
+                if files[file]["ids"]:
+                    db.delete(ids=files[file]["ids"])
+                del files[file]
+                summary["removed"].append(file)
+
+        for file, sha in wanted.items():
+            entry = files.get(file)
+            if entry and entry["sha256"] == sha and not rechunk:
+                continue
+            if entry and entry["ids"]:
+                db.delete(ids=entry["ids"])
+
+            docs = chunk_documents(PyPDFLoader(os.path.join(PDF_FOLDER, file)).load())
+            for doc in docs:
+                doc.metadata["content_hash"] = sha
+            ids = [f"{sha[:16]}-{i}" for i in range(len(docs))]
+            # Embed and write in bounded batches
+            for start in range(0, len(docs), POLICY_EMBED_BATCH):
+                db.add_documents(docs[start:start + POLICY_EMBED_BATCH], ids=ids[start:start + POLICY_EMBED_BATCH])
+            files[file] = {"sha256": sha, "ids": ids}
+            summary["updated" if entry else "added"].append(file)
+
+        if hasattr(db, "persist"):
+            try:
+                db.persist()
+            except Exception:
+                pass  # chromadb >= 0.4 persists automatically
+        if any(summary[k] for k in ("added", "updated", "removed")):
+            manifest["generation"] = manifest.get("generation", 0) + 1
+        _GENERATION = manifest.get("generation", 0)
+        _FINGERPRINT = hashlib.sha256(json.dumps(
+            [sorted((f, e["sha256"]) for f, e in files.items()), manifest["chunking"], manifest["embeddings"]],
+            sort_keys=True,
+        ).encode("utf-8")).hexdigest()
+        _save_manifest(manifest)
+        return summary
+
+
+def index_generation() -> int:
+    """Changes whenever the policy index is rebuilt or updated."""
+    return _GENERATION
+
+
+def index_fingerprint() -> str:
+    """Identifies the indexed content (files, chunking, embeddings) across restarts."""
+    return _FINGERPRINT
+
+
+def get_policy_vector_db():
+    global _policy_db
+    if _policy_db is None:
+        with _DB_LOCK:
+            if _policy_db is None:
+                db = Chroma(persist_directory=VECTOR_DB_DIR, embedding_function=get_embeddings())
+                summary = sync_policy_index(db)
+                if any(summary[k] for k in ("added", "updated", "removed")):
+                    print("📚 policy index sync:", summary)
+                _policy_db = db
     return _policy_db
+
+
+def refresh_policy_index() -> Dict[str, List[str]]:
+    """Re-syncs the loaded index after PDFs were added, changed or removed."""
+    return sync_policy_index(get_policy_vector_db())
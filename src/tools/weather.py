@@ -1,6 +1,163 @@
-import requests
-from typing import Any, Dict
+import os
+import re
+import time
+import asyncio
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List
+from .cache import TTLCache
 from .config import WEATHERAPI_KEY
+from .http_client import http_get, http_post, ahttp_get, ahttp_post, tool_timeout
+
+WEATHER_URL = "http://api.weatherapi.com/v1/current.json"
+
+# Current conditions barely move within minutes; cached per normalized location
+WEATHER_CACHE_TTL = float(os.getenv("WEATHER_CACHE_TTL", "600"))
+_WEATHER = TTLCache(maxsize=1024, ttl=WEATHER_CACHE_TTL)
+
+# Bulk requests need a paid WeatherAPI plan; switched off after the first refusal
+_bulk_supported = os.getenv("WEATHER_BULK", "1") == "1"
+
+
+def _weather_params(city: str) -> Dict[str, str]:
+    return {"key": WEATHERAPI_KEY, "q": city, "aqi": "no"}
+
+
+def _parse_weather(res: Dict[str, Any]) -> Dict[str, Any]:
+    if "error" in res:
+        raise ValueError(res["error"].get("message", "Error fetching weather"))
+    return {
+        "location": f"{res['location']['name']}, {res['location']['country']}",
+        "localtime": res['location']['localtime'],
+        "temperature_c": res['current']['temp_c'],
+        "temperature_f": res['current']['temp_f'],
+        "feels_like_c": res['current']['feelslike_c'],
+        "condition": res['current']['condition']['text'],
+        "humidity": res['current']['humidity'],
+        "wind_kph": res['current']['wind_kph'],
+        "wind_dir": res['current']['wind_dir'],
+    }
+
+
+def _norm_location(q: Any) -> str:
+    # "Patna ", "patna" and "Patna ,Bihar." -> "patna" / "patna, bihar"
+    text = re.sub(r"\s+", " ", str(q))
+    return re.sub(r"\s*,\s*", ", ", text).strip(" ,.").lower()
+
+
+def _remember(city: str, res: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Parses a response and caches it under the query as given and the
+    "name, region" it resolved to. "name, country" is not a key: two towns
+    with the same name in one country would overwrite each other.
+    """
+    info = {**_parse_weather(res), "fetched_at": time.time()}
+    loc = res["location"]
+    keys = {_norm_location(city), _norm_location(f"{loc['name']}, {loc['region']}")}
+    for key in keys:
+        _WEATHER.set(key, info)
+    return dict(info)
+
+
+def _result(city: str, res: Dict[str, Any]) -> Dict[str, Any]:
+    try:
+        return _remember(city, res)
+    except Exception as e:
+        return {"error": str(e)}
+
+
+def _bulk_body(cities: List[str]) -> Dict[str, Any]:
+    return {"locations": [{"q": c, "custom_id": str(i)} for i, c in enumerate(cities)]}
+
+
+def _bulk_items(res: Dict[str, Any]) -> Dict[int, Dict[str, Any]]:
+    """custom_id -> per-location response; raises when the plan has no bulk access."""
+    global _bulk_supported
+    if "error" in res:
+        _bulk_supported = False
+        raise ValueError(res["error"].get("message", "Bulk weather request refused"))
+    return {int(item["query"]["custom_id"]): item["query"] for item in res.get("bulk", [])}
+
+
+def _cached(cities: List[str]) -> tuple:
+    results: List[Any] = [None] * len(cities)
+    missing = []
+    for i, city in enumerate(cities):
+        info = _WEATHER.get(_norm_location(city))
+        if info is not None:
+            results[i] = dict(info)
+        else:
+            missing.append(i)
+    return results, missing
+
+
+def _fetch(city: str) -> Dict[str, Any]:
+    try:
+        res = http_get(WEATHER_URL, params=_weather_params(city), timeout=tool_timeout("weather")).json()
+    except Exception as e:
+        return {"error": str(e)}
+    return _result(city, res)
+
+
+def get_weather_many(cities: List[str]) -> List[Dict[str, Any]]:
+    """
+    Current weather for several locations, in input order. Cache misses go
+    out as one WeatherAPI bulk request, or one request per city when bulk
+    is unavailable.
+    """
+    if not WEATHERAPI_KEY:
+        return [{"error": "Missing WEATHERAPI_KEY"} for _ in cities]
+    results, missing = _cached(cities)
+    if len(missing) > 1 and _bulk_supported:
+        try:
+            batch = [cities[i] for i in missing]
+            res = http_post(WEATHER_URL, params=_weather_params("bulk"), json=_bulk_body(batch), timeout=tool_timeout("weather")).json()
+            items = _bulk_items(res)
+            for j, i in enumerate(missing):
+                if j in items:
+                    results[i] = _result(cities[i], items[j])
+        except Exception:
+            pass
+    todo = [i for i in missing if results[i] is None]
+    if len(todo) > 1:
+        with ThreadPoolExecutor(max_workers=min(8, len(todo))) as ex:
+            # each fetch carries the caller's tool deadline into its thread
+            futures = [ex.submit(contextvars.copy_context().run, _fetch, cities[i]) for i in todo]
+            for i, fut in zip(todo, futures):
+                results[i] = fut.result()
+    elif todo:
+        results[todo[0]] = _fetch(cities[todo[0]])
+    return results
+
+
+async def _fetch_async(city: str) -> Dict[str, Any]:
+    try:
+        resp = await ahttp_get(WEATHER_URL, params=_weather_params(city), timeout=tool_timeout("weather"))
+        res = resp.json()
+    except Exception as e:
+        return {"error": str(e)}
+    return _result(city, res)
+
+
+async def get_weather_many_async(cities: List[str]) -> List[Dict[str, Any]]:
+    if not WEATHERAPI_KEY:
+        return [{"error": "Missing WEATHERAPI_KEY"} for _ in cities]
+    results, missing = _cached(cities)
+    if len(missing) > 1 and _bulk_supported:
+        try:
+            batch = [cities[i] for i in missing]
+            resp = await ahttp_post(WEATHER_URL, params=_weather_params("bulk"), json=_bulk_body(batch), timeout=tool_timeout("weather"))
+            items = _bulk_items(resp.json())
+            for j, i in enumerate(missing):
+                if j in items:
+                    results[i] = _result(cities[i], items[j])
+        except Exception:
+            pass
+    todo = [i for i in missing if results[i] is None]
+    for i, info in zip(todo, await asyncio.gather(*[_fetch_async(cities[i]) for i in todo])):
+        results[i] = info
+    return results
+
 
 def weather_tool_node(state: Dict[str, Any]) -> Dict[str, Any]:
     q = state.get("tool_query")
@@ -10,24 +167,15 @@ def weather_tool_node(state: Dict[str, Any]) -> Dict[str, Any]:
         return {**state, "tool_result": {"error": "Missing WEATHERAPI_KEY"}}
 
     city = str(q).strip()
-    url = f"http://api.weatherapi.com/v1/current.json?key={WEATHERAPI_KEY}&q={city}&aqi=no"
+    return {**state, "tool_result": get_weather_many([city])[0]}
 
-    try:
-        res = requests.get(url, timeout=15).json()
-        if "error" in res:
-            raise ValueError(res["error"].get("message", "Error fetching weather"))
-        weather_info = {
-            "location": f"{res['location']['name']}, {res['location']['country']}",
-            "localtime": res['location']['localtime'],
-            "temperature_c": res['current']['temp_c'],
-            "temperature_f": res['current']['temp_f'],
-            "feels_like_c": res['current']['feelslike_c'],
-            "condition": res['current']['condition']['text'],
-            "humidity": res['current']['humidity'],
-            "wind_kph": res['current']['wind_kph'],
-            "wind_dir": res['current']['wind_dir'],
-        }
-    except Exception as e:
-        weather_info = {"error": str(e)}
 
-    return {**state, "tool_result": weather_info}
+async def weather_tool_node_async(state: Dict[str, Any]) -> Dict[str, Any]:
+    q = state.get("tool_query")
+    if not q:
+        return {**state, "tool_result": {"error": "Empty query"}}
+    if not WEATHERAPI_KEY:
+        return {**state, "tool_result": {"error": "Missing WEATHERAPI_KEY"}}
+
+    city = str(q).strip()
+    return {**state, "tool_result": (await get_weather_many_async([city]))[0]}